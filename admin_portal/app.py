@@ -1,9 +1,12 @@
 from contextlib import closing
-from datetime import date
-from collections import Counter
-import csv
+from datetime import date, datetime
 import io
 import os
+import re
+import sys
+import tempfile
+import time
+import uuid
 
 from flask import (
     Flask,
@@ -14,14 +17,37 @@ from flask import (
     session,
     flash,
     Response,
+    jsonify,
+    send_file,
 )
-import mysql.connector
 from mysql.connector import Error
 from functools import wraps
 
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from portal_common import assets, compression, metrics, migrations, profiling  # noqa: E402
+from portal_common.aggregates import (  # noqa: E402
+    ALL_RATINGS,
+    RATING_FILTERS,
+    feedback_stats,
+    registration_stats,
+)
+from portal_common.bulk_import import (  # noqa: E402
+    ImportFormatError,
+    import_registrations,
+    write_error_report,
+)
+from portal_common.conditional import DataVersion, conditional  # noqa: E402
+from portal_common.fanout import QueryFanout  # noqa: E402
+from portal_common.pagination import InvalidCursor, fetch_page, page_size_from  # noqa: E402
+from portal_common.routing import ConnectionRouter  # noqa: E402
+from portal_common.search import boolean_match_terms, is_exact_id, prefix_pattern  # noqa: E402
+from portal_common.streaming import EXPORT_MIMETYPES, stream_query  # noqa: E402
+
 
 app = Flask(__name__)
 app.secret_key = os.getenv("FLASK_SECRET_KEY", "super-secret-key")
+assets.init_app(app)
+compression.init_app(app)
 
 DB_CONFIG = {
     "host": os.getenv("DB_HOST", "localhost"),
@@ -33,10 +59,29 @@ DB_CONFIG = {
 ADMIN_USERNAME = os.getenv("ADMIN_USERNAME", "admin")
 ADMIN_PASSWORD = os.getenv("ADMIN_PASSWORD", "admin123")
 
+# Primary plus any DB_REPLICAS; GET requests read from replicas.
+db_pool = ConnectionRouter.from_env(DB_CONFIG)
+migrations.init_app(app, db_pool)
+metrics.init_app(app, db_pool)
+profiling.init_app(app, is_admin=lambda: session.get("admin_logged_in", False))
+fanout = QueryFanout.from_env(db_pool)
+
+# Shared with the public app; see DataVersion.
+data_version = DataVersion.from_env()
+data_version.bump()
+# Replica reads that may predate the latest write are flagged, so no stale
+# page or cache entry is stamped with the new version.
+db_pool.last_write = data_version.written_at
+
+
+def is_row_id(value: str) -> bool:
+    """ASCII digits only; ``str.isdigit()`` also accepts e.g. "²", which ``int()`` rejects."""
+    return bool(re.fullmatch(r"[0-9]+", value))
+
 
 def get_db_connection():
     try:
-        return mysql.connector.connect(**DB_CONFIG)
+        return db_pool.acquire()
     except Error as err:
         app.logger.error("DB connection failed: %s", err)
         return None
@@ -53,6 +98,30 @@ def login_required(fn):
     return wrapper
 
 
+def page_args() -> dict:
+    """Keyset pagination arguments (``per_page``, ``after``, ``before``) for ``fetch_page``."""
+    return {
+        "page_size": page_size_from(request.args.get("per_page")),
+        "after": request.args.get("after") or None,
+        "before": request.args.get("before") or None,
+    }
+
+
+@app.template_global()
+def page_url(**changes):
+    """URL of the current view with its filters kept and the page cursor replaced."""
+    args = request.args.to_dict()
+    args.pop("after", None)
+    args.pop("before", None)
+    args.update({key: value for key, value in changes.items() if value is not None})
+    return url_for(request.endpoint, **(request.view_args or {}), **args)
+
+
+def invalid_page():
+    flash("That page link is no longer valid; showing the first page", "warning")
+    return redirect(page_url())
+
+
 @app.route("/")
 def root():
     if session.get("admin_logged_in"):
@@ -82,8 +151,17 @@ def logout():
     return redirect(url_for("login"))
 
 
+DASHBOARD_QUERIES = {
+    "students": ("SELECT COUNT(*) FROM student", ()),
+    "events": ("SELECT COUNT(*) FROM event", ()),
+    "registrations": ("SELECT COUNT(*) FROM registration", ()),
+    "feedback": ("SELECT COUNT(*) FROM feedback", ()),
+}
+
+
 @app.route("/admin/dashboard")
 @login_required
+@conditional(data_version)
 def dashboard():
     stats = {
         "students": 0,
@@ -92,32 +170,19 @@ def dashboard():
         "feedback": 0,
     }
 
-    conn = get_db_connection()
-    if conn is None:
+    counts, failed = fanout.gather_scalars(DASHBOARD_QUERIES, defaults=stats)
+    stats.update(counts)
+    if len(failed) == len(DASHBOARD_QUERIES):
         flash("Could not connect to the database", "danger")
-        return render_template("dashboard.html", stats=stats)
-
-    try:
-        with closing(conn.cursor()) as cursor:
-            cursor.execute("SELECT COUNT(*) FROM student")
-            stats["students"] = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM event")
-            stats["events"] = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM registration")
-            stats["registrations"] = cursor.fetchone()[0]
-
-            cursor.execute("SELECT COUNT(*) FROM feedback")
-            stats["feedback"] = cursor.fetchone()[0]
-    finally:
-        conn.close()
+    elif failed:
+        flash("Some statistics are temporarily unavailable", "warning")
 
     return render_template("dashboard.html", stats=stats)
 
 
 @app.route("/admin/dashboard/events")
 @login_required
+@conditional(data_version)
 def events_dashboard():
     stats = {
         "total_events": 0,
@@ -145,8 +210,9 @@ def events_dashboard():
                        COALESCE(e.registration_count,
                                 (SELECT COUNT(*) FROM registration r WHERE r.event_id = e.event_id),
                                 0) AS registered,
-                       (SELECT ROUND(AVG(rating), 1) FROM feedback f WHERE f.event_id = e.event_id) AS avg_rating
+                       ROUND(fr.rating_sum / NULLIF(fr.feedback_count, 0), 1) AS avg_rating
                 FROM event e
+                LEFT JOIN event_feedback_rollup fr ON fr.event_id = e.event_id
                 ORDER BY e.date ASC
                 """
             )
@@ -185,11 +251,45 @@ def events_dashboard():
     )
 
 
+def registration_search_filter(query: str):
+    """WHERE clauses and params for the registrations search box.
+
+    Numeric input is matched exactly against USN / registration ID (primary
+    and foreign key lookups). Text goes through the FULLTEXT indexes on
+    student (name, department) and event (name) as semi-joins on the
+    registration foreign keys; words too short for the index fall back to
+    anchored prefix matches.
+    """
+    if not query:
+        return [], []
+    if is_exact_id(query):
+        return ["r.USN = %s OR r.reg_id = %s"], [int(query), int(query)]
+
+    terms = boolean_match_terms(query)
+    if terms is None:
+        like = prefix_pattern(query)
+        return ["s.name LIKE %s OR e.name LIKE %s OR s.department LIKE %s"], [like, like, like]
+    return [
+        """
+        r.USN IN (
+            SELECT USN FROM student
+            WHERE MATCH(name, department) AGAINST (%s IN BOOLEAN MODE)
+        )
+        OR r.event_id IN (
+            SELECT event_id FROM event
+            WHERE MATCH(name) AGAINST (%s IN BOOLEAN MODE)
+        )
+        """
+    ], [terms, terms]
+
+
 @app.route("/admin/dashboard/registrations")
 @login_required
+@conditional(data_version)
 def registrations_dashboard():
     query = request.args.get("q", "").strip()
     registrations = []
+    page = None
     stats = {
         "visible": 0,
         "unique_students": 0,
@@ -210,51 +310,71 @@ def registrations_dashboard():
 
     try:
         with closing(conn.cursor(dictionary=True)) as cursor:
-            sql = (
-                """
-                SELECT r.reg_id, r.registration_date, e.event_id, e.name AS event_name,
-                       s.USN, s.name AS student_name, s.department
+            columns = """
+                r.reg_id, r.registration_date, e.event_id, e.name AS event_name,
+                s.USN, s.name AS student_name, s.department
+            """
+            joins = """
                 FROM registration r
                 JOIN event e ON e.event_id = r.event_id
                 JOIN student s ON s.USN = r.USN
+            """
+            clauses, params = registration_search_filter(query)
+            terms = boolean_match_terms(query) if query and not is_exact_id(query) else None
+            if terms:
+                # Best matches first, as in the students view: the student
+                # and event relevance scores added up, as an exact DECIMAL
+                # column so keyset cursors can page through it.
+                sql = f"""
+                    SELECT * FROM (
+                        SELECT {columns},
+                               CAST(MATCH(s.name, s.department) AGAINST (%s IN BOOLEAN MODE)
+                                    + MATCH(e.name) AGAINST (%s IN BOOLEAN MODE)
+                                    AS DECIMAL(12, 6)) AS relevance
+                        {joins}
+                        WHERE {" AND ".join(f"({clause})" for clause in clauses)}
+                    ) ranked
                 """
-            )
-            params = []
-            if query:
-                sql += (
-                    " WHERE e.name LIKE %s OR s.name LIKE %s OR s.USN LIKE %s OR s.department LIKE %s"
+                registrations, page = fetch_page(
+                    cursor,
+                    sql,
+                    [("relevance", "relevance"), ("reg_id", "reg_id")],
+                    params=[terms, terms] + params,
+                    descending=True,
+                    **page_args(),
+                )
+            else:
+                registrations, page = fetch_page(
+                    cursor,
+                    f"SELECT {columns} {joins}",
+                    [("r.registration_date", "registration_date"), ("r.reg_id", "reg_id")],
+                    clauses,
+                    params,
+                    descending=True,
+                    **page_args(),
                 )
-                like = f"%{query}%"
-                params = [like, like, like, like]
-            sql += " ORDER BY r.registration_date DESC"
-            cursor.execute(sql, params)
-            registrations = cursor.fetchall()
+            stats = registration_stats(cursor, clauses, params)
+    except InvalidCursor:
+        return invalid_page()
     finally:
         conn.close()
 
-    if registrations:
-        stats["visible"] = len(registrations)
-        stats["unique_students"] = len({row["USN"] for row in registrations})
-        stats["latest_registration"] = registrations[0]
-        counts = Counter(row["event_name"] for row in registrations)
-        stats["busiest_event"] = counts.most_common(1)[0] if counts else None
-
-        dept_counter = Counter((row["department"] or "Unknown") for row in registrations)
-        stats["per_department"] = dept_counter.most_common()
-
     return render_template(
         "registrations_dashboard.html",
         registrations=registrations,
         stats=stats,
         query=query,
+        page=page,
     )
 
 
 @app.route("/admin/dashboard/feedback")
 @login_required
+@conditional(data_version)
 def feedback_dashboard():
     rating_filter = request.args.get("rating", "").strip()
     feedback_rows = []
+    page = None
     stats = {
         "total": 0,
         "avg_rating": None,
@@ -288,43 +408,38 @@ def feedback_dashboard():
             )
             clauses = []
             params = []
-            if rating_filter == "good":
-                clauses.append("f.rating >= 4")
-            elif rating_filter == "average":
-                clauses.append("f.rating = 3")
-            elif rating_filter == "poor":
-                clauses.append("f.rating <= 2")
-            if clauses:
-                sql += " WHERE " + " AND ".join(clauses)
-            sql += " ORDER BY f.submitted_at DESC"
-            cursor.execute(sql, params)
-            feedback_rows = cursor.fetchall()
+            ratings = RATING_FILTERS.get(rating_filter, ALL_RATINGS)
+            if ratings != ALL_RATINGS:
+                clauses.append("f.rating IN ({})".format(", ".join(["%s"] * len(ratings))))
+                params.extend(ratings)
+            feedback_rows, page = fetch_page(
+                cursor,
+                sql,
+                [("f.submitted_at", "submitted_at"), ("f.feedback_id", "feedback_id")],
+                clauses,
+                params,
+                descending=True,
+                **page_args(),
+            )
+            stats, rating_distribution = feedback_stats(cursor, ratings)
+    except InvalidCursor:
+        return invalid_page()
     finally:
         conn.close()
 
-    if feedback_rows:
-        stats["total"] = len(feedback_rows)
-        total_rating = sum(row["rating"] for row in feedback_rows)
-        stats["avg_rating"] = round(total_rating / stats["total"], 1)
-        positive = sum(1 for row in feedback_rows if row["rating"] >= 4)
-        stats["positive_pct"] = int((positive / stats["total"]) * 100)
-        counts = Counter(row["event_name"] for row in feedback_rows)
-        stats["trending_event"] = counts.most_common(1)[0] if counts else None
-
-        for row in feedback_rows:
-            rating_distribution[row["rating"]] += 1
-
     return render_template(
         "feedback_dashboard.html",
         feedback=feedback_rows,
         stats=stats,
         rating_filter=rating_filter,
         rating_distribution=rating_distribution,
+        page=page,
     )
 
 
 @app.route("/admin/students")
 @login_required
+@conditional(data_version)
 def students():
     query = request.args.get("q", "").strip()
     conn = get_db_connection()
@@ -333,32 +448,56 @@ def students():
         flash("Database unavailable", "danger")
         return render_template("students.html", students=results, query=query)
 
+    page = None
     try:
         with closing(conn.cursor(dictionary=True)) as cursor:
-            if query:
-                like = f"%{query}%"
-                cursor.execute(
-                    """
-                    SELECT USN, name, department, email, phone
-                    FROM student
-                    WHERE USN LIKE %s OR name LIKE %s
-                    ORDER BY name ASC
-                    """,
-                    (like, like),
-                )
-            else:
-                cursor.execute(
-                    "SELECT USN, name, department, email, phone FROM student ORDER BY name ASC"
-                )
-            results = cursor.fetchall()
+            select_sql = "SELECT USN, name, department, email, phone FROM student"
+            order = [("name", "name"), ("USN", "USN")]
+            ranked = False
+            clauses = []
+            params = []
+            terms = boolean_match_terms(query) if query and not is_exact_id(query) else None
+            if query and is_exact_id(query):
+                clauses = ["USN = %s"]
+                params = [int(query)]
+            elif terms:
+                # Best matches first. Relevance is an exact DECIMAL column of
+                # the derived table so keyset cursors can page through it.
+                select_sql = """
+                    SELECT * FROM (
+                        SELECT USN, name, department, email, phone,
+                               CAST(MATCH(name, department) AGAINST (%s IN BOOLEAN MODE)
+                                    AS DECIMAL(12, 6)) AS relevance
+                        FROM student
+                        WHERE MATCH(name, department) AGAINST (%s IN BOOLEAN MODE)
+                    ) ranked
+                """
+                order = [("relevance", "relevance"), ("USN", "USN")]
+                ranked = True
+                params = [terms, terms]
+            elif query:
+                clauses = ["name LIKE %s"]
+                params = [prefix_pattern(query)]
+            results, page = fetch_page(
+                cursor,
+                select_sql,
+                order,
+                clauses,
+                params,
+                descending=ranked,
+                **page_args(),
+            )
+    except InvalidCursor:
+        return invalid_page()
     finally:
         conn.close()
 
-    return render_template("students.html", students=results, query=query)
+    return render_template("students.html", students=results, query=query, page=page)
 
 
 @app.route("/admin/events")
 @login_required
+@conditional(data_version)
 def events():
     conn = get_db_connection()
     rows = []
@@ -395,6 +534,7 @@ def delete_event(event_id: int):
         with closing(conn.cursor()) as cursor:
             cursor.execute("DELETE FROM event WHERE event_id = %s", (event_id,))
             conn.commit()
+            data_version.bump()
             flash("Event deleted", "success")
     except Error as err:
         conn.rollback()
@@ -404,12 +544,106 @@ def delete_event(event_id: int):
     return redirect(url_for("events"))
 
 
+# The import page lists the first IMPORT_ERROR_PREVIEW rejected rows; the
+# full list is written to a CSV under IMPORT_REPORT_DIR for download.
+IMPORT_ERROR_PREVIEW = int(os.getenv("IMPORT_ERROR_PREVIEW", "100"))
+IMPORT_REPORT_DIR = os.getenv("IMPORT_REPORT_DIR") or os.path.join(
+    tempfile.gettempdir(), "event_portal_import_reports"
+)
+IMPORT_REPORT_MAX_AGE = 24 * 3600
+
+
+def save_error_report(errors) -> str:
+    """Write ``errors`` to a new report file and return its token."""
+    os.makedirs(IMPORT_REPORT_DIR, exist_ok=True)
+    cutoff = time.time() - IMPORT_REPORT_MAX_AGE
+    for entry in os.scandir(IMPORT_REPORT_DIR):
+        try:
+            if entry.stat().st_mtime < cutoff:
+                os.unlink(entry.path)
+        except FileNotFoundError:
+            pass  # pruned concurrently by another worker
+
+    token = uuid.uuid4().hex
+    path = os.path.join(IMPORT_REPORT_DIR, f"{token}.csv")
+    with open(path, "w", newline="", encoding="utf-8") as fh:
+        write_error_report(errors, fh)
+    return token
+
+
+@app.route("/admin/import/registrations", methods=["GET", "POST"])
+@login_required
+def import_registrations_view():
+    conn = get_db_connection()
+    event_options = []
+    report = None
+    if conn is None:
+        flash("Database unavailable", "danger")
+        return render_template("import_registrations.html", events=event_options, report=report)
+
+    try:
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            cursor.execute("SELECT event_id, name, date FROM event ORDER BY date ASC")
+            event_options = cursor.fetchall()
+
+        if request.method == "POST":
+            upload = request.files.get("file")
+            event_id_raw = request.form.get("event_id", "").strip()
+            default_event_id = int(event_id_raw) if is_row_id(event_id_raw) else None
+            if not upload or not upload.filename:
+                flash("Choose a CSV file to upload", "warning")
+            else:
+                # Wrap the upload stream so rows are parsed as they are read.
+                lines = io.TextIOWrapper(upload.stream, encoding="utf-8-sig", newline="")
+                try:
+                    report = import_registrations(conn, lines, default_event_id)
+                except ImportFormatError as err:
+                    flash(f"Could not read {upload.filename}: {err}", "danger")
+                else:
+                    # Chunks commit as they go, so bump even if reading stopped early.
+                    if report["imported"]:
+                        data_version.bump()
+                    if report["file_error"]:
+                        flash(
+                            f"Could not read all of {upload.filename}. {report['file_error']}; "
+                            "rows before it were processed as reported below.",
+                            "danger",
+                        )
+                    if report["errors"]:
+                        report["download"] = save_error_report(report["errors"])
+                        session["import_report"] = report["download"]
+                    flash(
+                        f"Imported {report['imported']} of {report['rows']} rows "
+                        f"({len(report['errors'])} rejected)",
+                        "success" if not report["errors"] else "warning",
+                    )
+    finally:
+        conn.close()
+
+    return render_template(
+        "import_registrations.html", events=event_options, report=report, preview=IMPORT_ERROR_PREVIEW
+    )
+
+
+@app.route("/admin/import/registrations/errors/<token>.csv")
+@login_required
+def import_errors_download(token: str):
+    path = os.path.join(IMPORT_REPORT_DIR, f"{token}.csv")
+    # Only the admin who ran the import gets its report.
+    if token != session.get("import_report") or not os.path.exists(path):
+        flash("That error report has expired; import the file again to regenerate it", "warning")
+        return redirect(url_for("import_registrations_view"))
+    return send_file(path, mimetype="text/csv", as_attachment=True, download_name="import-errors.csv")
+
+
 @app.route("/admin/event/<int:event_id>/registrations")
 @login_required
+@conditional(data_version)
 def event_registrations(event_id: int):
     conn = get_db_connection()
     registrations = []
     event = None
+    page = None
     if conn is None:
         flash("Database unavailable", "danger")
         return render_template("registrations.html", registrations=registrations, event=event)
@@ -419,17 +653,21 @@ def event_registrations(event_id: int):
             cursor.execute("SELECT event_id, name FROM event WHERE event_id = %s", (event_id,))
             event = cursor.fetchone()
             if event:
-                cursor.execute(
+                registrations, page = fetch_page(
+                    cursor,
                     """
                     SELECT r.reg_id, r.registration_date, s.USN, s.name AS student_name, s.department
                     FROM registration r
                     JOIN student s ON s.USN = r.USN
-                    WHERE r.event_id = %s
-                    ORDER BY r.registration_date DESC
                     """,
-                    (event_id,),
+                    [("r.registration_date", "registration_date"), ("r.reg_id", "reg_id")],
+                    ["r.event_id = %s"],
+                    [event_id],
+                    descending=True,
+                    **page_args(),
                 )
-                registrations = cursor.fetchall()
+    except InvalidCursor:
+        return invalid_page()
     finally:
         conn.close()
 
@@ -437,11 +675,14 @@ def event_registrations(event_id: int):
         flash("Event not found", "warning")
         return redirect(url_for("events"))
 
-    return render_template("registrations.html", registrations=registrations, event=event)
+    return render_template(
+        "registrations.html", registrations=registrations, event=event, page=page
+    )
 
 
 @app.route("/admin/event/<int:event_id>/feedback")
 @login_required
+@conditional(data_version)
 def event_feedback(event_id: int):
     conn = get_db_connection()
     feedback_rows = []
@@ -477,97 +718,110 @@ def event_feedback(event_id: int):
     return render_template("feedback.html", feedback=feedback_rows, event=event)
 
 
-@app.route("/admin/export/registrations")
+@app.route("/admin/pool")
 @login_required
-def export_registrations():
+def pool_stats():
+    return jsonify(db_pool.stats())
+
+
+def export_response(select_sql: str, ts_column: str, id_column: str, header: list, basename: str):
+    """Stream an export of ``select_sql`` honoring the export query parameters.
+
+    ``format`` is ``csv`` (default) or ``ndjson``; ``compress=gzip`` returns
+    a ``.gz`` file. ``after_id`` makes the export incremental: only rows
+    with a larger id are returned, in id order, so the last row of one run
+    is the watermark for the next. Ids are assigned when a row is inserted,
+    so rows that arrive late (e.g. feedback flushed from the write-behind
+    queue) are never skipped. The older ``since`` (ISO timestamp) plus
+    optional ``since_id`` watermark is still accepted, but it trusts row
+    timestamps to grow with insertion order.
+    """
+    fmt = request.args.get("format", "csv").strip().lower()
+    compress = request.args.get("compress", "").strip().lower()
+    since_raw = request.args.get("since", "").strip()
+    since_id_raw = request.args.get("since_id", "").strip()
+    after_id_raw = request.args.get("after_id", "").strip()
+
+    if fmt not in EXPORT_MIMETYPES or compress not in ("", "gzip"):
+        flash("Unsupported export format", "warning")
+        return redirect(url_for("dashboard"))
+
+    sql = select_sql
+    params = []
+    if after_id_raw:
+        if not is_row_id(after_id_raw):
+            flash("'after_id' must be a row ID such as 5003", "warning")
+            return redirect(url_for("dashboard"))
+        sql += f" WHERE {id_column} > %s ORDER BY {id_column} ASC"
+        params = [int(after_id_raw)]
+    elif since_raw:
+        try:
+            since = datetime.fromisoformat(since_raw)
+        except ValueError:
+            flash("'since' must be an ISO timestamp such as 2025-01-15T10:00:00", "warning")
+            return redirect(url_for("dashboard"))
+        since_id = int(since_id_raw) if is_row_id(since_id_raw) else 0
+        sql += f" WHERE {ts_column} > %s OR ({ts_column} = %s AND {id_column} > %s)"
+        sql += f" ORDER BY {ts_column} ASC, {id_column} ASC"
+        params = [since, since, since_id]
+    else:
+        sql += f" ORDER BY {ts_column} DESC"
+
     conn = get_db_connection()
     if conn is None:
         flash("Database unavailable", "danger")
         return redirect(url_for("dashboard"))
 
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Registration ID", "Event", "USN", "Student", "Department", "Registered At"])
+    body = stream_query(conn, sql, params, fmt=fmt, header=header, gzip=compress == "gzip")
+    filename = f"{basename}.{fmt}" + (".gz" if compress else "")
+    return Response(
+        body,
+        mimetype="application/gzip" if compress else EXPORT_MIMETYPES[fmt],
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
 
-    try:
-        with closing(conn.cursor(dictionary=True)) as cursor:
-            cursor.execute(
-                """
-                SELECT r.reg_id, e.name AS event_name, s.USN, s.name AS student_name,
-                       s.department, r.registration_date
-                FROM registration r
-                JOIN event e ON e.event_id = r.event_id
-                JOIN student s ON s.USN = r.USN
-                ORDER BY r.registration_date DESC
-                """
-            )
-            for row in cursor.fetchall():
-                writer.writerow(
-                    [
-                        row["reg_id"],
-                        row["event_name"],
-                        row["USN"],
-                        row["student_name"],
-                        row["department"],
-                        row["registration_date"],
-                    ]
-                )
-    finally:
-        conn.close()
 
-    output.seek(0)
-    return Response(
-        output.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": "attachment; filename=registrations.csv"},
+@app.route("/admin/export/registrations")
+@login_required
+def export_registrations():
+    return export_response(
+        """
+        SELECT r.reg_id, e.name AS event_name, s.USN, s.name AS student_name,
+               s.department, r.registration_date
+        FROM registration r
+        JOIN event e ON e.event_id = r.event_id
+        JOIN student s ON s.USN = r.USN
+        """,
+        "r.registration_date",
+        "r.reg_id",
+        ["Registration ID", "Event", "USN", "Student", "Department", "Registered At"],
+        "registrations",
     )
 
 
 @app.route("/admin/export/feedback")
 @login_required
 def export_feedback():
-    conn = get_db_connection()
-    if conn is None:
-        flash("Database unavailable", "danger")
-        return redirect(url_for("dashboard"))
-
-    output = io.StringIO()
-    writer = csv.writer(output)
-    writer.writerow(["Feedback ID", "Event", "USN", "Student", "Rating", "Comment", "Submitted At"])
+    return export_response(
+        """
+        SELECT f.feedback_id, e.name AS event_name, s.USN, s.name AS student_name,
+               f.rating, f.comment, f.submitted_at
+        FROM feedback f
+        JOIN event e ON e.event_id = f.event_id
+        JOIN student s ON s.USN = f.USN
+        """,
+        "f.submitted_at",
+        "f.feedback_id",
+        ["Feedback ID", "Event", "USN", "Student", "Rating", "Comment", "Submitted At"],
+        "feedback",
+    )
 
-    try:
-        with closing(conn.cursor(dictionary=True)) as cursor:
-            cursor.execute(
-                """
-                SELECT f.feedback_id, e.name AS event_name, s.USN, s.name AS student_name,
-                       f.rating, f.comment, f.submitted_at
-                FROM feedback f
-                JOIN event e ON e.event_id = f.event_id
-                JOIN student s ON s.USN = f.USN
-                ORDER BY f.submitted_at DESC
-                """
-            )
-            for row in cursor.fetchall():
-                writer.writerow(
-                    [
-                        row["feedback_id"],
-                        row["event_name"],
-                        row["USN"],
-                        row["student_name"],
-                        row["rating"],
-                        row.get("comment", ""),
-                        row["submitted_at"],
-                    ]
-                )
-    finally:
-        conn.close()
 
-    output.seek(0)
-    return Response(
-        output.getvalue(),
-        mimetype="text/csv",
-        headers={"Content-Disposition": "attachment; filename=feedback.csv"},
-    )
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Fingerprint and precompress static assets (run at deploy time)."""
+    manifest = assets.build_assets(app.static_folder)
+    print(f"Built {len(manifest)} asset(s) into {app.static_folder}/{assets.DIST_DIR}.")
 
 
 if __name__ == "__main__":
@@ -3,6 +3,11 @@
 CREATE DATABASE IF NOT EXISTS event_admin;
 USE event_admin;
 
+-- This is the base schema; later changes are versioned migrations in
+-- ../migrations. Apply them with `flask --app app db-migrate` after loading
+-- this file, so fresh and upgraded databases end up identical.
+DROP TABLE IF EXISTS schema_migrations;
+DROP TABLE IF EXISTS event_feedback_rollup;
 DROP TABLE IF EXISTS feedback;
 DROP TABLE IF EXISTS registration;
 DROP TABLE IF EXISTS student;
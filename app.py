@@ -1,12 +1,36 @@
+import atexit
 from contextlib import closing
 from datetime import datetime
-from flask import Flask, render_template, request, flash
-import mysql.connector
+from flask import Flask, render_template, request, flash, jsonify
 from mysql.connector import Error
+from werkzeug.exceptions import TooManyRequests
+import os
 import re
 
+from portal_common import assets, compression, db_session, metrics, migrations, profiling
+from portal_common.admission import AdmissionController
+from portal_common.cache import SnapshotCache
+from portal_common.conditional import DataVersion, conditional
+from portal_common.counters import reconcile_registration_counts
+from portal_common.registrations import (
+    ALREADY_REGISTERED,
+    EVENT_FULL,
+    EVENT_NOT_FOUND,
+    RESERVED,
+    STUDENT_NOT_FOUND,
+    register_student,
+)
+from portal_common.rollups import rebuild_feedback_rollups
+from portal_common.routing import ConnectionRouter, read_unsettled
+from portal_common.seats import SeatBroadcaster
+from portal_common.db_session import get_db
+from portal_common.fanout import QueryFanout
+from portal_common.ingest import FeedbackQueue
+
 app = Flask(__name__)
 app.secret_key = "event_portal_secret_key_2024"
+assets.init_app(app)
+compression.init_app(app)
 
 
 @app.context_processor
@@ -24,18 +48,53 @@ DB_CONFIG = {
     "autocommit": False
 }
 
+# Primary plus any DB_REPLICAS; GET requests read from replicas.
+db_pool = ConnectionRouter.from_env(DB_CONFIG)
+db_session.init_app(app, db_pool)
+migrations.init_app(app, db_pool)
+metrics.init_app(app, db_pool)
+profiling.init_app(app)
+fanout = QueryFanout.from_env(db_pool)
 
+# Caps concurrent registration/feedback writes, globally and per event, so a
+# flash crowd queues briefly or gets a 429 instead of swamping MySQL.
+admission = AdmissionController.from_env()
+admission.init_app(app)
 
 
+def posted_event_id() -> str:
+    return request.form.get("event_id", "").strip()
 
 
-def get_db_connection():
-    """Create a new database connection."""
-    try:
-        return mysql.connector.connect(**DB_CONFIG)
-    except Error as err:
-        app.logger.error("Database connection failed: %s", err)
-        return None
+@app.errorhandler(TooManyRequests)
+def too_many_requests(err):
+    response = app.make_response(
+        (render_template("error.html", message=err.description), err.code)
+    )
+    if err.retry_after is not None:
+        response.headers["Retry-After"] = str(err.retry_after)
+    return response
+
+
+# Bumped after every committed write; drives conditional GETs and the home
+# stats cache. Bumping at startup means a deploy never serves a stale 304.
+data_version = DataVersion.from_env()
+data_version.bump()
+# Replica reads that may predate the latest write are flagged, so no stale
+# page or cache entry is stamped with the new version.
+db_pool.last_write = data_version.written_at
+
+# Optional write-behind feedback ingestion (FEEDBACK_QUEUE_DIR). Segments a
+# crashed worker left behind are picked up now; the rest is flushed at exit.
+feedback_queue = FeedbackQueue.from_env(db_pool, on_flush=data_version.bump)
+if feedback_queue is not None:
+    feedback_queue.recover()
+    atexit.register(feedback_queue.close)
+
+# Live seat counts for the events and register pages, pushed over SSE. One
+# poller per process reloads counts when the data version moves.
+seat_updates = SeatBroadcaster.from_env(db_pool, version=data_version.current, logger=app.logger)
+seat_updates.init_app(app)
 
 
 # Input validation functions (aligned with INT columns in DB)
@@ -53,7 +112,50 @@ def is_valid_rating(rating: str) -> bool:
 # --------------------------
 # HOME PAGE
 # --------------------------
+HOME_STATS_QUERIES = {
+    "total_events": ("SELECT COUNT(*) FROM event", ()),
+    "upcoming": ("SELECT COUNT(*) FROM event WHERE date IS NULL OR date >= CURDATE()", ()),
+    "total_registrations": ("SELECT COUNT(*) FROM registration", ()),
+    "average_rating": (
+        """
+        SELECT ROUND(SUM(rating_sum) / NULLIF(SUM(feedback_count), 0), 1)
+        FROM event_feedback_rollup
+        """,
+        (),
+    ),
+}
+
+
+def load_home_stats():
+    """Run the landing page aggregates concurrently; cached by ``home_stats``.
+
+    Queries that fail or time out fall back to their defaults. A partial
+    snapshot, or one read from a replica that may not have the latest write
+    yet, is still returned but not kept, so the next request retries.
+    """
+    values, failed = fanout.gather_scalars(
+        HOME_STATS_QUERIES,
+        defaults={"total_events": 0, "upcoming": 0, "total_registrations": 0},
+    )
+    if len(failed) == len(HOME_STATS_QUERIES):
+        raise Error("Database connection failed")
+    if failed or read_unsettled():
+        home_stats.invalidate()
+
+    avg = values.pop("average_rating")
+    values["average_rating"] = f"{avg}/5" if avg is not None else None
+    return values
+
+
+home_stats = SnapshotCache(
+    load_home_stats,
+    ttl=float(os.getenv("HOME_STATS_TTL", "30")),
+    version=data_version.current,
+)
+
+
 @app.route("/")
+@conditional(data_version)
 def home():
     stats = {
         "total_events": 0,
@@ -62,35 +164,10 @@ def home():
         "average_rating": None,
     }
 
-    conn = get_db_connection()
-    if conn is None:
-        return render_template("index.html", stats=stats)
-
     try:
-        with closing(conn.cursor(dictionary=True)) as cursor:
-            cursor.execute("SELECT COUNT(*) AS total FROM event")
-            stats["total_events"] = cursor.fetchone()["total"]
-
-            cursor.execute(
-                """
-                SELECT COUNT(*) AS upcoming
-                FROM event
-                WHERE date IS NULL OR date >= CURDATE()
-                """
-            )
-            stats["upcoming"] = cursor.fetchone()["upcoming"]
-
-            cursor.execute("SELECT COUNT(*) AS total FROM registration")
-            stats["total_registrations"] = cursor.fetchone()["total"]
-
-            cursor.execute("SELECT ROUND(AVG(rating), 1) AS avg_rating FROM feedback")
-            avg = cursor.fetchone()["avg_rating"]
-            stats["average_rating"] = f"{avg}/5" if avg is not None else None
-
+        stats = home_stats.get()
     except Error as err:
         app.logger.error("Failed to load home stats: %s", err)
-    finally:
-        conn.close()
 
     return render_template("index.html", stats=stats)
 
@@ -98,8 +175,9 @@ def home():
 # VIEW ALL EVENTS
 # --------------------------
 @app.route("/events")
+@conditional(data_version)
 def events():
-    conn = get_db_connection()
+    conn = get_db()
     if conn is None:
         return render_template("error.html", message="Database connection failed"), 500
 
@@ -116,10 +194,7 @@ def events():
                     venue,
                     organizer,
                     max_seats,
-                    IFNULL(
-                        (SELECT COUNT(*) FROM registration r WHERE r.event_id = event.event_id),
-                        0
-                    ) AS registered_count
+                    IFNULL(registration_count, 0) AS registered_count
                 FROM event
                 ORDER BY date ASC, time ASC
                 """
@@ -147,107 +222,81 @@ def events():
     except Error as err:
         app.logger.error("Failed to load events: %s", err)
         return render_template("error.html", message=f"Database error: {err}"), 500
-    finally:
-        conn.close()
+
+
+@app.route("/events/stream")
+def seat_stream():
+    """Server-Sent Events feed of seat-count changes for open pages."""
+    return seat_updates.response(request.headers.get("Last-Event-ID"))
 
 # --------------------------
 # REGISTER STUDENT TO EVENT
 # --------------------------
-@app.route("/register", methods=["GET", "POST"])
-def register():
-    event_options = get_event_options()
-    conn = get_db_connection()
-    if conn is None:
-        return render_template("error.html", message="Database connection failed"), 500
+REGISTRATION_ERRORS = {
+    STUDENT_NOT_FOUND: "Student not found. Please verify the USN.",
+    EVENT_NOT_FOUND: "Selected event does not exist.",
+    EVENT_FULL: "Event is already at capacity.",
+    ALREADY_REGISTERED: "Student already registered for this event.",
+}
 
-    try:
-        if request.method == "POST":
-            reg_id_raw = request.form.get("reg_id", "").strip()
-            event_id_raw = request.form.get("event_id", "").strip()
-            usn_raw = request.form.get("usn", "").strip()
 
-            if not is_valid_numeric(reg_id_raw):
-                flash("Registration ID must be a number", "error")
-                return render_template("register.html", events=event_options), 400
+def render_register_form(status: int = 200):
+    # Event options are only needed when the form is shown again, so a
+    # successful registration never runs the dropdown query.
+    return render_template("register.html", events=get_event_options()), status
 
-            if not is_valid_numeric(event_id_raw):
-                flash("Please choose a valid event", "error")
-                return render_template("register.html", events=event_options), 400
 
-            if not is_valid_numeric(usn_raw):
-                flash("USN must be numeric, matching the student table", "error")
-                return render_template("register.html", events=event_options), 400
+@app.route("/register", methods=["GET", "POST"])
+@conditional(data_version)
+@admission.limit(posted_event_id)
+def register():
+    if request.method != "POST":
+        return render_register_form()
 
-            reg_id = int(reg_id_raw)
-            event_id = int(event_id_raw)
-            usn = int(usn_raw)
+    event_id_raw = request.form.get("event_id", "").strip()
+    usn_raw = request.form.get("usn", "").strip()
 
-            with closing(conn.cursor(dictionary=True)) as cursor:
-                # Ensure student exists
-                cursor.execute("SELECT name FROM student WHERE USN = %s", (usn,))
-                student = cursor.fetchone()
-                if not student:
-                    flash("Student not found. Please verify the USN.", "error")
-                    return render_template("register.html", events=event_options), 400
-
-                # Ensure event exists and seats available
-                cursor.execute("SELECT name, max_seats FROM event WHERE event_id = %s", (event_id,))
-                event = cursor.fetchone()
-                if not event:
-                    flash("Selected event does not exist.", "error")
-                    return render_template("register.html", events=event_options), 400
-
-                cursor.execute("SELECT COUNT(*) AS cnt FROM registration WHERE event_id = %s", (event_id,))
-                registered = cursor.fetchone()["cnt"]
-                if event["max_seats"] is not None and registered >= event["max_seats"]:
-                    flash("Event is already at capacity.", "error")
-                    return render_template("register.html", events=event_options), 400
-
-                # Duplicate checks
-                cursor.execute("SELECT 1 FROM registration WHERE reg_id = %s", (reg_id,))
-                if cursor.fetchone():
-                    flash("Registration ID already exists.", "error")
-                    return render_template("register.html", events=event_options), 400
-
-                cursor.execute(
-                    "SELECT 1 FROM registration WHERE event_id = %s AND USN = %s",
-                    (event_id, usn),
-                )
-                if cursor.fetchone():
-                    flash("Student already registered for this event.", "error")
-                    return render_template("register.html", events=event_options), 400
-
-                cursor.execute(
-                    """
-                    INSERT INTO registration (reg_id, event_id, USN)
-                    VALUES (%s, %s, %s)
-                    """,
-                    (reg_id, event_id, usn),
-                )
-                conn.commit()
+    if not is_valid_numeric(event_id_raw):
+        flash("Please choose a valid event", "error")
+        return render_register_form(400)
 
-            return render_template(
-                "success.html",
-                message="Registration Successful!",
-                link_text="View Events",
-                link_url="/events",
-            )
+    if not is_valid_numeric(usn_raw):
+        flash("USN must be numeric, matching the student table", "error")
+        return render_register_form(400)
+
+    conn = get_db()
+    if conn is None:
+        return render_template("error.html", message="Database connection failed"), 500
 
-        return render_template("register.html", events=event_options)
+    try:
+        outcome, reg_id = register_student(conn, int(event_id_raw), int(usn_raw))
     except Error as err:
         conn.rollback()
         app.logger.error("Registration failed: %s", err)
         return render_template("error.html", message=f"Database error: {err}"), 500
-    finally:
-        conn.close()
+
+    if outcome != RESERVED:
+        flash(REGISTRATION_ERRORS[outcome], "error")
+        return render_register_form(400)
+
+    data_version.bump()
+    seat_updates.notify()
+    return render_template(
+        "success.html",
+        message=f"Registration Successful! Your registration ID is {reg_id}.",
+        link_text="View Events",
+        link_url="/events",
+    )
 
 # --------------------------
 # SUBMIT FEEDBACK
 # --------------------------
 @app.route("/feedback", methods=["GET", "POST"])
+@conditional(data_version)
+@admission.limit(posted_event_id)
 def feedback():
     event_options = get_event_options()
-    conn = get_db_connection()
+    conn = get_db()
     if conn is None:
         return render_template("error.html", message="Database connection failed"), 500
 
@@ -289,14 +338,23 @@ def feedback():
                     flash("Event not found.", "error")
                     return render_template("feedback.html", events=event_options), 400
 
-                cursor.execute(
-                    """
-                    INSERT INTO feedback (event_id, USN, rating, comment)
-                    VALUES (%s, %s, %s, %s)
-                    """,
-                    (event_id, usn, rating, comment or None),
+                # With write-behind enabled the row is only fsynced to the
+                # local queue here; the flusher inserts it and bumps the data
+                # version. A full queue falls back to a direct insert.
+                queued = feedback_queue is not None and feedback_queue.enqueue(
+                    event_id, usn, rating, comment or None
                 )
-                conn.commit()
+                if not queued:
+                    cursor.execute(
+                        """
+                        INSERT INTO feedback (event_id, USN, rating, comment)
+                        VALUES (%s, %s, %s, %s)
+                        """,
+                        (event_id, usn, rating, comment or None),
+                    )
+                    conn.commit()
+            if not queued:
+                data_version.bump()
 
             return render_template(
                 "success.html",
@@ -310,15 +368,13 @@ def feedback():
         conn.rollback()
         app.logger.error("Feedback submission failed: %s", err)
         return render_template("error.html", message=f"Database error: {err}"), 500
-    finally:
-        conn.close()
 
 # --------------------------
 # HELPER FUNCTIONS
 # --------------------------
 def get_event_options():
-    """Fetch events for dropdowns."""
-    conn = get_db_connection()
+    """Fetch events for dropdowns on the request's shared connection."""
+    conn = get_db()
     if conn is None:
         return []
 
@@ -334,7 +390,7 @@ def get_event_options():
                     venue, 
                     organizer, 
                     max_seats,
-                    IFNULL((SELECT COUNT(*) FROM registration r WHERE r.event_id = event.event_id), 0) AS registered_count
+                    IFNULL(registration_count, 0) AS registered_count
                 FROM event
                 ORDER BY date ASC
                 """
@@ -343,11 +399,65 @@ def get_event_options():
     except Error as err:
         app.logger.error("Failed to fetch event options: %s", err)
         return []
+   
+
+
+
+
+@app.route("/health/db")
+def db_health():
+    """Up/down for load balancers.
+
+    Pool, replica and queue detail is internal, so only clients allowed to
+    read ``/metrics`` get it.
+    """
+    try:
+        db_pool.acquire(timeout=1.0, readonly=False).close()
+        health = {"status": "ok"}
+    except Error as err:
+        app.logger.error("Health check failed: %s", err)
+        health = {"status": "unavailable"}
+    if metrics.scraper_allowed():
+        health.update(db_pool.stats())
+        if feedback_queue is not None:
+            health["feedback_queue"] = feedback_queue.stats()
+    return jsonify(health), 200 if health["status"] == "ok" else 503
+
+
+@app.cli.command("reconcile-counts")
+def reconcile_counts_command():
+    """Repair drift between event.registration_count and the registration table."""
+    conn = db_pool.acquire()
+    try:
+        drift = reconcile_registration_counts(conn)
     finally:
         conn.close()
-   
+    if drift:
+        data_version.bump()
+
+    for row in drift:
+        print(f"event {row['event_id']}: stored {row['stored']}, actual {row['actual']}")
+    print(f"Repaired {len(drift)} event counter(s).")
+
+
+@app.cli.command("rebuild-feedback-rollups")
+def rebuild_feedback_rollups_command():
+    """Recompute event_feedback_rollup from the feedback table."""
+    conn = db_pool.acquire()
+    try:
+        rebuilt = rebuild_feedback_rollups(conn)
+    finally:
+        conn.close()
+    data_version.bump()
+
+    print(f"Rebuilt feedback rollups for {rebuilt} event(s).")
 
 
+@app.cli.command("build-assets")
+def build_assets_command():
+    """Fingerprint and precompress static assets (run at deploy time)."""
+    manifest = assets.build_assets(app.static_folder)
+    print(f"Built {len(manifest)} asset(s) into {app.static_folder}/{assets.DIST_DIR}.")
 
 
 # --------------------------
@@ -0,0 +1,207 @@
+"""Check that every query the two apps issue is served by an index.
+
+Imports both apps, records each SELECT they send while their routes are
+requested through Flask test clients (following the first "older" pager
+link, so keyset page queries are covered too), then EXPLAINs every distinct
+statement. A plan fails when a table is read with a full scan
+(``type = ALL``) or sorted with a filesort. Exempt are grouped results
+(``Using temporary``), derived tables and tables whose plan estimates fewer
+than ``--min-rows`` rows, since MySQL rightly scans tiny tables. Exits
+non-zero if any plan fails.
+
+Run it after ``flask db-migrate`` against a database seeded with
+bench/seed.py, so the optimizer sees production-like row counts. Both apps
+use their usual DB settings (the admin app reads DB_HOST, DB_USER,
+DB_PASSWORD and DB_NAME). Searches of words shorter than the FULLTEXT
+minimum fall back to prefix LIKEs across joined tables and are not covered.
+
+    python bench/check_query_plans.py --min-rows 1000
+"""
+import argparse
+from contextlib import closing
+import importlib.util
+import os
+import re
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+# Tables read in full by design.
+ALLOWED_SCANS = {
+    "event_feedback_rollup": "one row per event; replaces scanning feedback",
+}
+
+_SELECT_RE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+_OLDER_RE = re.compile(r"[?&]after=([\w-]+)")
+
+
+class RecordingCursor:
+    def __init__(self, cursor, statements):
+        self._cursor = cursor
+        self._statements = statements
+
+    def execute(self, operation, params=None, multi=False):
+        result = self._cursor.execute(operation, params, multi=multi)
+        if _SELECT_RE.match(operation):
+            self._statements.add(self._cursor.statement)
+        return result
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+
+class RecordingConnection:
+    def __init__(self, raw, statements):
+        self._raw = raw
+        self._statements = statements
+
+    def cursor(self, *args, **kwargs):
+        return RecordingCursor(self._raw.cursor(*args, **kwargs), self._statements)
+
+    def __getattr__(self, name):
+        return getattr(self._raw, name)
+
+
+def record_statements(pool) -> set:
+    """Make ``pool`` (or every pool behind a router) record SELECTs."""
+    statements = set()
+    for target in getattr(pool, "pools", [pool]):
+        target.dispose()
+        target._connect = _recording(target._connect, statements)
+    return statements
+
+
+def _recording(connect, statements):
+    return lambda **config: RecordingConnection(connect(**config), statements)
+
+
+def load_app(name, path):
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Flask locates templates through sys.modules[name].
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
+
+
+def visit(client, paths):
+    for path in paths:
+        response = client.get(path)
+        if response.status_code >= 500:
+            print(f"  {path}: HTTP {response.status_code}", file=sys.stderr)
+        older = _OLDER_RE.search(response.get_data(as_text=True))
+        if older:
+            separator = "&" if "?" in path else "?"
+            client.get(f"{path}{separator}after={older.group(1)}")
+        # Streamed exports only run their query as the body is consumed.
+        response.close()
+
+
+def plan_problems(plan_rows, min_rows) -> list:
+    problems = []
+    for row in plan_rows:
+        table = row.get("table") or ""
+        extra = row.get("Extra") or ""
+        if table.startswith("<") or table in ALLOWED_SCANS or (row.get("rows") or 0) < min_rows:
+            continue
+        if row.get("type") == "ALL":
+            problems.append(f"full scan of {table} (~{row['rows']} rows)")
+        if "Using filesort" in extra and "Using temporary" not in extra:
+            problems.append(f"filesort on {table}")
+    return problems
+
+
+def explain_all(pool, statements, min_rows) -> int:
+    failures = 0
+    conn = pool.acquire()
+    try:
+        with closing(conn.cursor(dictionary=True)) as cursor:
+            for statement in sorted(statements):
+                cursor.execute("EXPLAIN " + statement)
+                problems = plan_problems(cursor.fetchall(), min_rows)
+                summary = " ".join(statement.split())
+                if problems:
+                    failures += 1
+                    print(f"FAIL  {summary[:160]}")
+                    for problem in problems:
+                        print(f"        - {problem}")
+                else:
+                    print(f"ok    {summary[:160]}")
+    finally:
+        conn.close()
+    return failures
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument(
+        "--min-rows", type=int, default=1000,
+        help="ignore plan steps estimated below this many rows",
+    )
+    args = parser.parse_args()
+
+    public = load_app("public_app", os.path.join(ROOT, "app.py"))
+    admin = load_app("admin_app", os.path.join(ROOT, "admin_portal", "app.py"))
+    public_statements = record_statements(public.db_pool)
+    admin_statements = record_statements(admin.db_pool)
+
+    conn = admin.db_pool.acquire()
+    try:
+        with closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT event_id FROM event ORDER BY event_id LIMIT 1")
+            row = cursor.fetchone()
+            cursor.execute("SELECT MIN(USN) FROM student")
+            usn = cursor.fetchone()[0]
+    finally:
+        conn.close()
+    event_id = row[0] if row else 1
+    admin_statements.clear()
+
+    visit(public.app.test_client(), ["/", "/events", "/register", "/feedback"])
+
+    client = admin.app.test_client()
+    with client.session_transaction() as session:
+        session["admin_logged_in"] = True
+        session["admin_username"] = "query-plan-check"
+    visit(
+        client,
+        [
+            "/admin/dashboard",
+            "/admin/dashboard/events",
+            "/admin/dashboard/registrations",
+            "/admin/dashboard/registrations?q=data",
+            f"/admin/dashboard/registrations?q={usn}",
+            "/admin/dashboard/feedback",
+            "/admin/dashboard/feedback?rating=good",
+            "/admin/students",
+            "/admin/students?q=priya",
+            "/admin/students?q=pr",
+            f"/admin/students?q={usn}",
+            "/admin/events",
+            f"/admin/event/{event_id}/registrations",
+            f"/admin/event/{event_id}/feedback",
+            "/admin/import/registrations",
+            "/admin/export/registrations",
+            "/admin/export/registrations?since=2024-01-01T00:00:00&since_id=0",
+            "/admin/export/registrations?after_id=0",
+            "/admin/export/feedback",
+            "/admin/export/feedback?since=2024-01-01T00:00:00&since_id=0",
+            "/admin/export/feedback?after_id=0",
+        ],
+    )
+
+    print(f"Public app: {len(public_statements)} distinct SELECTs")
+    failures = explain_all(public.db_pool, public_statements, args.min_rows)
+    print(f"Admin app: {len(admin_statements)} distinct SELECTs")
+    failures += explain_all(admin.db_pool, admin_statements, args.min_rows)
+
+    print(f"{failures} query plan(s) need an index." if failures else "All query plans use indexes.")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
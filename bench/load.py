@@ -0,0 +1,268 @@
+"""Drive every route of both apps and report latency, throughput and queries.
+
+Each route is exercised in its own phase: ``--requests`` requests spread
+over ``--concurrency`` threads, after ``--warmup`` unmeasured ones. For every
+route the report has p50/p95/p99/mean/max latency, throughput, error count,
+response size and (with ``--count-queries``) MySQL statements per request,
+taken from the server's global ``Questions`` counter. That counter covers
+the whole server, so only use it on an otherwise idle database.
+
+Results are written as JSON (``--output``); ``--compare`` prints the change
+against an earlier run so regressions stand out. Requests are plain GETs
+without validators, so conditional responses (304s) are not exercised;
+``--write-routes`` adds the registration and feedback POSTs. Point the tool
+at a database seeded with bench/seed.py.
+
+    python bench/load.py --concurrency 16 --requests 500 --count-queries \\
+        --output bench/results/$(date +%Y%m%d-%H%M).json --compare bench/results/baseline.json
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+from datetime import datetime
+import http.cookiejar
+import json
+import os
+import random
+import statistics
+import sys
+import threading
+import time
+import urllib.error
+import urllib.parse
+import urllib.request
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", "password"),
+    "database": os.getenv("DB_NAME", "event_portal"),
+}
+
+
+def build_routes(args):
+    """``(name, app, method, path_or_factory, form_or_factory)`` per route."""
+    rng = random.Random(args.seed)
+    lock = threading.Lock()
+
+    def pick(low, count):
+        with lock:
+            return low + rng.randrange(count)
+
+    def event_id():
+        return pick(args.id_base, args.events)
+
+    def usn():
+        return pick(args.id_base, args.students)
+
+    routes = [
+        ("home", "public", "GET", "/", None),
+        ("events", "public", "GET", "/events", None),
+        ("register_form", "public", "GET", "/register", None),
+        ("feedback_form", "public", "GET", "/feedback", None),
+        ("admin_dashboard", "admin", "GET", "/admin/dashboard", None),
+        ("admin_events_dashboard", "admin", "GET", "/admin/dashboard/events", None),
+        ("admin_registrations_dashboard", "admin", "GET", "/admin/dashboard/registrations", None),
+        ("admin_registrations_search", "admin", "GET", "/admin/dashboard/registrations?q=data", None),
+        ("admin_feedback_dashboard", "admin", "GET", "/admin/dashboard/feedback", None),
+        ("admin_feedback_good", "admin", "GET", "/admin/dashboard/feedback?rating=good", None),
+        ("admin_students", "admin", "GET", "/admin/students", None),
+        ("admin_students_search", "admin", "GET", "/admin/students?q=priya", None),
+        ("admin_events", "admin", "GET", "/admin/events", None),
+        (
+            "admin_event_registrations", "admin", "GET",
+            lambda: f"/admin/event/{event_id()}/registrations", None,
+        ),
+        ("admin_event_feedback", "admin", "GET", lambda: f"/admin/event/{event_id()}/feedback", None),
+        ("admin_export_registrations", "admin", "GET", "/admin/export/registrations", None),
+        ("admin_export_feedback", "admin", "GET", "/admin/export/feedback?format=ndjson", None),
+    ]
+    if args.write_routes:
+        routes += [
+            (
+                "register_submit", "public", "POST", "/register",
+                lambda: {"event_id": event_id(), "usn": usn()},
+            ),
+            (
+                "feedback_submit", "public", "POST", "/feedback",
+                lambda: {"event_id": event_id(), "usn": usn(), "rating": pick(1, 5), "comment": "bench"},
+            ),
+        ]
+    if args.only:
+        routes = [route for route in routes if route[0] in args.only]
+    return routes
+
+
+def make_opener():
+    return urllib.request.build_opener(urllib.request.HTTPCookieProcessor(http.cookiejar.CookieJar()))
+
+
+def admin_login(opener, base_url, username, password):
+    data = urllib.parse.urlencode({"username": username, "password": password}).encode()
+    with opener.open(base_url + "/admin/login", data=data, timeout=30) as response:
+        response.read()
+
+
+def fetch(opener, url, form, timeout, compressed):
+    request = urllib.request.Request(url, data=urllib.parse.urlencode(form).encode() if form else None)
+    if compressed:
+        request.add_header("Accept-Encoding", "gzip")
+    began = time.perf_counter()
+    try:
+        with opener.open(request, timeout=timeout) as response:
+            size = 0
+            for block in iter(lambda: response.read(65536), b""):
+                size += len(block)
+            status = response.status
+    except urllib.error.HTTPError as err:
+        # 4xx answers (seat full, already registered) are valid outcomes.
+        size, status = len(err.read()), err.code
+    except (urllib.error.URLError, OSError):
+        size, status = 0, None
+    return time.perf_counter() - began, status, size
+
+
+def questions(conn):
+    with closing(conn.cursor()) as cursor:
+        cursor.execute("SHOW GLOBAL STATUS LIKE 'Questions'")
+        return int(cursor.fetchone()[1])
+
+
+def percentile(sorted_values, pct):
+    if not sorted_values:
+        return None
+    index = min(len(sorted_values) - 1, max(0, round(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[index]
+
+
+def run_route(route, args, openers, db_conn):
+    name, app, method, path, form = route
+    base_url = args.public_url if app == "public" else args.admin_url
+    opener = openers[app]
+
+    def one(_):
+        url = base_url + (path() if callable(path) else path)
+        body = (form() if callable(form) else form) if method == "POST" else None
+        return fetch(opener, url, body, args.timeout, args.compressed)
+
+    with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+        list(executor.map(one, range(args.warmup)))
+        before = questions(db_conn) if db_conn else None
+        began = time.perf_counter()
+        samples = list(executor.map(one, range(args.requests)))
+        wall = time.perf_counter() - began
+        after = questions(db_conn) if db_conn else None
+
+    latencies = sorted(sample[0] * 1000 for sample in samples)
+    errors = sum(1 for _, status, _ in samples if status is None or status >= 500)
+    result = {
+        "app": app,
+        "method": method,
+        "path": path if isinstance(path, str) else "(randomised)",
+        "requests": len(samples),
+        "errors": errors,
+        "throughput_rps": round(len(samples) / wall, 2) if wall else None,
+        "latency_ms": {
+            "p50": round(percentile(latencies, 50), 2),
+            "p95": round(percentile(latencies, 95), 2),
+            "p99": round(percentile(latencies, 99), 2),
+            "mean": round(statistics.fmean(latencies), 2),
+            "max": round(latencies[-1], 2),
+        },
+        "bytes_mean": round(statistics.fmean(sample[2] for sample in samples)),
+        "status_codes": {},
+    }
+    for _, status, _ in samples:
+        key = str(status)
+        result["status_codes"][key] = result["status_codes"].get(key, 0) + 1
+    if db_conn:
+        # Minus the SHOW STATUS statement itself.
+        result["queries_per_request"] = round((after - before - 1) / len(samples), 2)
+    return result
+
+
+def print_report(results, baseline=None):
+    header = f"{'route':34} {'p50':>8} {'p95':>8} {'p99':>8} {'rps':>8} {'q/req':>6} {'err':>4}"
+    print(header)
+    print("-" * len(header))
+    for name, result in results.items():
+        latency = result["latency_ms"]
+        line = (
+            f"{name:34} {latency['p50']:8.1f} {latency['p95']:8.1f} {latency['p99']:8.1f} "
+            f"{result['throughput_rps']:8.1f} {result.get('queries_per_request', '-'):>6} "
+            f"{result['errors']:4}"
+        )
+        previous = (baseline or {}).get(name)
+        if previous:
+            change = (latency["p95"] - previous["latency_ms"]["p95"]) / previous["latency_ms"]["p95"] * 100
+            line += f"   p95 {change:+.0f}%"
+        print(line)
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--public-url", default="http://localhost:5007")
+    parser.add_argument("--admin-url", default="http://localhost:5004")
+    parser.add_argument("--admin-user", default=os.getenv("ADMIN_USERNAME", "admin"))
+    parser.add_argument("--admin-password", default=os.getenv("ADMIN_PASSWORD", "admin123"))
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=200, help="measured requests per route")
+    parser.add_argument("--warmup", type=int, default=20)
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--compressed", action="store_true", help="send Accept-Encoding: gzip")
+    parser.add_argument("--write-routes", action="store_true", help="include registration/feedback POSTs")
+    parser.add_argument("--only", nargs="+", metavar="ROUTE", help="run just these routes")
+    parser.add_argument("--count-queries", action="store_true", help="measure MySQL statements per request")
+    parser.add_argument("--students", type=int, default=100_000, help="as passed to seed.py")
+    parser.add_argument("--events", type=int, default=500, help="as passed to seed.py")
+    parser.add_argument("--id-base", type=int, default=1_000_000, help="as passed to seed.py")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="write results as JSON to this file")
+    parser.add_argument("--compare", help="earlier JSON results to compare against")
+    args = parser.parse_args()
+
+    openers = {"public": make_opener(), "admin": make_opener()}
+    admin_login(openers["admin"], args.admin_url, args.admin_user, args.admin_password)
+
+    db_conn = None
+    if args.count_queries:
+        import mysql.connector
+
+        db_conn = mysql.connector.connect(**DB_CONFIG)
+
+    results = {}
+    try:
+        for route in build_routes(args):
+            print(f"running {route[0]}...", file=sys.stderr)
+            results[route[0]] = run_route(route, args, openers, db_conn)
+    finally:
+        if db_conn:
+            db_conn.close()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as fh:
+            baseline = json.load(fh)["routes"]
+    print_report(results, baseline)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as fh:
+            json.dump(
+                {
+                    "started_at": datetime.now().isoformat(timespec="seconds"),
+                    "settings": {
+                        key: getattr(args, key)
+                        for key in ("concurrency", "requests", "warmup", "compressed", "write_routes")
+                    },
+                    "routes": results,
+                },
+                fh,
+                indent=2,
+            )
+        print(f"Saved results to {args.output}")
+    return 0 if not any(result["errors"] for result in results.values()) else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,123 @@
+"""Concurrency check for seat reservation on a single hot event.
+
+Fires ``--attempts`` parallel reservations at one scratch event with
+``--seats`` seats and asserts that exactly ``min(attempts, seats)`` succeed,
+that the registration table holds that many rows and that
+``event.registration_count`` agrees. Exits non-zero on any mismatch.
+
+Needs a MySQL database with the public portal schema: admin_portal/db.sql
+(counter triggers) plus the migrations (register_student procedure), applied
+with ``flask db-migrate``. Connection settings come from DB_HOST, DB_USER,
+DB_PASSWORD and DB_NAME. The scratch event and students use ids from
+900000000 upwards and are removed afterwards.
+
+    python bench/seat_race.py --attempts 500 --seats 120 --workers 64
+"""
+import argparse
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import closing
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from portal_common.db_pool import ConnectionPool  # noqa: E402
+from portal_common.registrations import RESERVED, register_student  # noqa: E402
+
+BASE_ID = 900000000
+EVENT_ID = BASE_ID + 1
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", "password"),
+    "database": os.getenv("DB_NAME", "event_portal"),
+    "autocommit": False,
+}
+
+
+def cleanup(conn):
+    with closing(conn.cursor()) as cursor:
+        cursor.execute("DELETE FROM registration WHERE event_id = %s", (EVENT_ID,))
+        cursor.execute("DELETE FROM event WHERE event_id = %s", (EVENT_ID,))
+        cursor.execute("DELETE FROM student WHERE USN >= %s", (BASE_ID,))
+    conn.commit()
+
+
+def setup(conn, attempts: int, seats: int):
+    cleanup(conn)
+    with closing(conn.cursor()) as cursor:
+        cursor.execute(
+            """
+            INSERT INTO event (event_id, name, date, max_seats, registration_count)
+            VALUES (%s, 'Seat race', CURDATE(), %s, 0)
+            """,
+            (EVENT_ID, seats),
+        )
+        cursor.executemany(
+            "INSERT INTO student (USN, name, department) VALUES (%s, %s, 'BENCH')",
+            [(BASE_ID + i, f"Bench student {i}") for i in range(attempts)],
+        )
+    conn.commit()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--attempts", type=int, default=500)
+    parser.add_argument("--seats", type=int, default=120)
+    parser.add_argument("--workers", type=int, default=64)
+    args = parser.parse_args()
+
+    pool = ConnectionPool(DB_CONFIG, size=args.workers, max_overflow=0, timeout=30)
+    conn = pool.acquire()
+    try:
+        setup(conn, args.attempts, args.seats)
+    finally:
+        conn.close()
+
+    start = threading.Barrier(min(args.workers, args.attempts))
+
+    def attempt(i: int) -> str:
+        if i < start.parties:
+            start.wait()
+        conn = pool.acquire()
+        try:
+            return register_student(conn, EVENT_ID, BASE_ID + i)[0]
+        finally:
+            conn.close()
+
+    began = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        outcomes = list(executor.map(attempt, range(args.attempts)))
+    elapsed = time.perf_counter() - began
+
+    conn = pool.acquire()
+    try:
+        with closing(conn.cursor()) as cursor:
+            cursor.execute("SELECT COUNT(*) FROM registration WHERE event_id = %s", (EVENT_ID,))
+            rows = cursor.fetchone()[0]
+            cursor.execute("SELECT registration_count FROM event WHERE event_id = %s", (EVENT_ID,))
+            counter = cursor.fetchone()[0]
+        conn.rollback()
+        cleanup(conn)
+    finally:
+        conn.close()
+    pool.dispose()
+
+    reserved = outcomes.count(RESERVED)
+    expected = min(args.attempts, args.seats)
+    print(
+        f"{args.attempts} attempts, {args.workers} workers, {args.seats} seats: "
+        f"{reserved} reserved, {rows} rows, counter {counter} "
+        f"in {elapsed:.2f}s ({args.attempts / elapsed:.0f} attempts/s)"
+    )
+    if not reserved == rows == counter == expected:
+        print(f"FAIL: expected exactly {expected} registrations")
+        return 1
+    print("OK")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,206 @@
+"""Bulk-load realistic synthetic data for benchmarking.
+
+Generates students, events, registrations and feedback at a configurable
+scale and inserts them in batches. The shape follows real usage: event
+popularity is skewed (a few events draw most registrations), each
+(event, USN) pair registers at most once, registrations precede their
+event, and feedback comes from registrants of past events. Generation is
+deterministic for a given ``--seed``.
+
+The counter and rollup triggers (admin_portal/db.sql and the migrations)
+fire as rows go in, so ``event.registration_count`` and
+``event_feedback_rollup`` stay consistent. Generated ids start at
+``--id-base`` so they do not collide with the sample rows; ``--reset``
+deletes previously generated rows first. Connection settings come from
+DB_HOST, DB_USER, DB_PASSWORD and DB_NAME.
+
+    python bench/seed.py --students 100000 --events 500 --registrations 1000000
+"""
+import argparse
+from contextlib import closing
+from datetime import datetime, timedelta
+import os
+import random
+import sys
+import time
+
+import mysql.connector
+
+DB_CONFIG = {
+    "host": os.getenv("DB_HOST", "localhost"),
+    "user": os.getenv("DB_USER", "root"),
+    "password": os.getenv("DB_PASSWORD", "password"),
+    "database": os.getenv("DB_NAME", "event_portal"),
+    "autocommit": False,
+}
+
+DEPARTMENTS = ["CSE", "ISE", "ECE", "EEE", "MECH", "CIVIL", "AIML", "MBA"]
+FIRST_NAMES = [
+    "Aarav", "Aditi", "Akash", "Ananya", "Arjun", "Deepika", "Divya", "Harsh",
+    "Ishaan", "Kavya", "Meera", "Nikhil", "Priya", "Rahul", "Rohan", "Sneha",
+    "Tanvi", "Varun", "Vikram", "Zoya",
+]
+LAST_NAMES = ["Rao", "Sharma", "Iyer", "Patel", "Reddy", "Nair", "Gupta", "Kumar", "Shetty", "Das"]
+EVENT_KINDS = ["Workshop", "Hackathon", "Seminar", "Bootcamp", "Symposium", "Meetup", "Quiz", "Fest"]
+EVENT_TOPICS = [
+    "Data Science", "Cloud Computing", "Robotics", "Cyber Security", "Web Development",
+    "Machine Learning", "Entrepreneurship", "IoT", "Blockchain", "Photography",
+]
+VENUES = ["Main Auditorium", "Seminar Hall A", "Seminar Hall B", "CSE Lab 3", "Open Air Theatre"]
+COMMENTS = [
+    None, None, "Great session!", "Very informative", "Could be longer", "Well organised",
+    "Too crowded", "Loved the hands-on part", "Average", "Speaker was excellent",
+]
+
+
+def batches(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i : i + size]
+
+
+def insert(conn, sql, rows, batch_size, label):
+    began = time.perf_counter()
+    with closing(conn.cursor()) as cursor:
+        for chunk in batches(rows, batch_size):
+            cursor.executemany(sql, chunk)
+            conn.commit()
+    elapsed = time.perf_counter() - began
+    print(f"  {label}: {len(rows)} rows in {elapsed:.1f}s ({len(rows) / max(elapsed, 1e-9):.0f} rows/s)")
+
+
+def reset(conn, id_base):
+    # Children first; the delete triggers keep counters and rollups in step.
+    with closing(conn.cursor()) as cursor:
+        cursor.execute("DELETE FROM feedback WHERE feedback_id >= %s", (id_base,))
+        cursor.execute("DELETE FROM registration WHERE reg_id >= %s", (id_base,))
+        cursor.execute("DELETE FROM event_feedback_rollup WHERE event_id >= %s", (id_base,))
+        cursor.execute("DELETE FROM event WHERE event_id >= %s", (id_base,))
+        cursor.execute("DELETE FROM student WHERE USN >= %s", (id_base,))
+    conn.commit()
+
+
+def generate(args, rng):
+    now = datetime.now().replace(microsecond=0)
+    usns = [args.id_base + i for i in range(args.students)]
+    students = [
+        (
+            usn,
+            f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}",
+            rng.choice(DEPARTMENTS),
+            f"student{usn}@campus.edu",
+            f"9{rng.randrange(10**9):09d}",
+        )
+        for usn in usns
+    ]
+
+    # Zipf-like popularity: event k gets a share proportional to 1 / k^0.8.
+    weights = [1 / (rank ** 0.8) for rank in range(1, args.events + 1)]
+    scale = args.registrations / sum(weights)
+    sizes = [min(args.students, max(1, round(w * scale))) for w in weights]
+    rng.shuffle(sizes)
+
+    events, registrations, feedback = [], [], []
+    reg_id = feedback_id = args.id_base
+    for i, size in enumerate(sizes):
+        event_id = args.id_base + i
+        event_date = now + timedelta(days=rng.randint(-365, 90))
+        events.append(
+            (
+                event_id,
+                f"{rng.choice(EVENT_TOPICS)} {rng.choice(EVENT_KINDS)} {i + 1}",
+                "Synthetic benchmark event",
+                event_date.date(),
+                f"{rng.randint(9, 17):02d}:00:00",
+                rng.choice(VENUES),
+                "Bench Club",
+                size + rng.randint(0, max(1, size // 5)),
+            )
+        )
+        past = event_date < now
+        for usn in rng.sample(usns, size):
+            registered_at = event_date - timedelta(minutes=rng.randint(60, 60 * 24 * 30))
+            registrations.append((reg_id, event_id, usn, registered_at))
+            reg_id += 1
+            if past and rng.random() < args.feedback_rate:
+                submitted_at = event_date + timedelta(minutes=rng.randint(30, 60 * 24 * 3))
+                feedback.append(
+                    (
+                        feedback_id,
+                        event_id,
+                        usn,
+                        rng.choices((1, 2, 3, 4, 5), weights=(5, 8, 20, 37, 30))[0],
+                        rng.choice(COMMENTS),
+                        min(submitted_at, now),
+                    )
+                )
+                feedback_id += 1
+
+    # Insert in time order, as production would have.
+    registrations.sort(key=lambda row: row[3])
+    feedback.sort(key=lambda row: row[5])
+    return students, events, registrations, feedback
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--students", type=int, default=100_000)
+    parser.add_argument("--events", type=int, default=500)
+    parser.add_argument("--registrations", type=int, default=1_000_000)
+    parser.add_argument(
+        "--feedback-rate", type=float, default=0.3,
+        help="share of past-event registrations that leave feedback",
+    )
+    parser.add_argument("--batch-size", type=int, default=5000)
+    parser.add_argument("--id-base", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--reset", action="store_true", help="delete previously generated rows first")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    print("Generating rows...")
+    students, events, registrations, feedback = generate(args, rng)
+
+    conn = mysql.connector.connect(**DB_CONFIG)
+    try:
+        if args.reset:
+            print("Removing previously generated rows...")
+            reset(conn, args.id_base)
+        print("Loading:")
+        insert(
+            conn,
+            "INSERT INTO student (USN, name, department, email, phone) VALUES (%s, %s, %s, %s, %s)",
+            students, args.batch_size, "student",
+        )
+        insert(
+            conn,
+            """
+            INSERT INTO event (event_id, name, description, date, time, venue, organizer, max_seats)
+            VALUES (%s, %s, %s, %s, %s, %s, %s, %s)
+            """,
+            events, args.batch_size, "event",
+        )
+        insert(
+            conn,
+            "INSERT INTO registration (reg_id, event_id, USN, registration_date) VALUES (%s, %s, %s, %s)",
+            registrations, args.batch_size, "registration",
+        )
+        insert(
+            conn,
+            """
+            INSERT INTO feedback (feedback_id, event_id, USN, rating, comment, submitted_at)
+            VALUES (%s, %s, %s, %s, %s, %s)
+            """,
+            feedback, args.batch_size, "feedback",
+        )
+        with closing(conn.cursor()) as cursor:
+            for table in ("student", "event", "registration", "feedback", "event_feedback_rollup"):
+                cursor.execute(f"ANALYZE TABLE {table}")
+                cursor.fetchall()
+    finally:
+        conn.close()
+    print("Done.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -146,7 +146,9 @@
 -- JOIN event ON registration.event_id = event.event_id
 -- WHERE event.name = 'Data Science Seminar';
 
-
-
-
-
+-- --------------------------------------------------------------
+-- Create the schema with admin_portal/db.sql, then apply the
+-- versioned migrations in migrations/ with `flask --app app db-migrate`
+-- (register_student procedure, search indexes, feedback rollups,
+-- unique registrations, listing indexes, feedback idempotency keys).
+-- --------------------------------------------------------------
@@ -0,0 +1,64 @@
+-- Server-generated registration IDs and single round-trip registration.
+-- register_student() validates, locks the event row, inserts and commits in
+-- one CALL and returns (outcome, reg_id); see portal_common/registrations.py.
+
+-- migrate:up
+ALTER TABLE registration MODIFY reg_id INT NOT NULL AUTO_INCREMENT;
+
+DROP PROCEDURE IF EXISTS register_student;
+DELIMITER //
+CREATE PROCEDURE register_student(IN p_event_id INT, IN p_usn INT)
+proc: BEGIN
+    DECLARE v_found INT DEFAULT 1;
+    DECLARE v_max_seats INT;
+    DECLARE v_registered INT;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND SET v_found = 0;
+    DECLARE EXIT HANDLER FOR SQLEXCEPTION
+    BEGIN
+        ROLLBACK;
+        RESIGNAL;
+    END;
+
+    IF NOT EXISTS (SELECT 1 FROM student WHERE USN = p_usn) THEN
+        SELECT 'student_not_found' AS outcome, NULL AS reg_id;
+        LEAVE proc;
+    END IF;
+
+    START TRANSACTION;
+
+    -- Concurrent registrations for the same event queue on this row lock.
+    SELECT max_seats, IFNULL(registration_count, 0)
+    INTO v_max_seats, v_registered
+    FROM event
+    WHERE event_id = p_event_id
+    FOR UPDATE;
+
+    IF v_found = 0 THEN
+        ROLLBACK;
+        SELECT 'event_not_found' AS outcome, NULL AS reg_id;
+        LEAVE proc;
+    END IF;
+
+    IF EXISTS (SELECT 1 FROM registration WHERE event_id = p_event_id AND USN = p_usn) THEN
+        ROLLBACK;
+        SELECT 'already_registered' AS outcome, NULL AS reg_id;
+        LEAVE proc;
+    END IF;
+
+    IF v_max_seats IS NOT NULL AND v_registered >= v_max_seats THEN
+        ROLLBACK;
+        SELECT 'event_full' AS outcome, NULL AS reg_id;
+        LEAVE proc;
+    END IF;
+
+    -- increment_registration_count bumps the counter under the same lock.
+    INSERT INTO registration (event_id, USN) VALUES (p_event_id, p_usn);
+    COMMIT;
+    SELECT 'reserved' AS outcome, LAST_INSERT_ID() AS reg_id;
+END;//
+DELIMITER ;
+
+-- migrate:down
+DROP PROCEDURE IF EXISTS register_student;
+
+ALTER TABLE registration MODIFY reg_id INT NOT NULL;
@@ -0,0 +1,12 @@
+-- Full-text indexes behind the admin search boxes (student name /
+-- department, event name). Numeric searches use the primary keys.
+
+-- migrate:up
+ALTER TABLE student ADD FULLTEXT INDEX ft_student_name_department (name, department);
+
+ALTER TABLE event ADD FULLTEXT INDEX ft_event_name (name);
+
+-- migrate:down
+ALTER TABLE event DROP INDEX ft_event_name;
+
+ALTER TABLE student DROP INDEX ft_student_name_department;
@@ -0,0 +1,72 @@
+-- Per-event feedback rollup (count, rating sum, 1-5 histogram) maintained
+-- by triggers, read by the home page and the admin dashboards. MySQL does
+-- not fire triggers for cascaded deletes; run
+-- `flask --app app rebuild-feedback-rollups` to repair after such deletes.
+
+-- migrate:up
+CREATE TABLE event_feedback_rollup (
+    event_id INT PRIMARY KEY,
+    feedback_count INT NOT NULL DEFAULT 0,
+    rating_sum INT NOT NULL DEFAULT 0,
+    rating_1 INT NOT NULL DEFAULT 0,
+    rating_2 INT NOT NULL DEFAULT 0,
+    rating_3 INT NOT NULL DEFAULT 0,
+    rating_4 INT NOT NULL DEFAULT 0,
+    rating_5 INT NOT NULL DEFAULT 0,
+    FOREIGN KEY (event_id) REFERENCES event(event_id) ON DELETE CASCADE
+);
+
+DELIMITER //
+CREATE TRIGGER rollup_feedback_insert
+AFTER INSERT ON feedback
+FOR EACH ROW
+BEGIN
+    IF NEW.event_id IS NOT NULL AND NEW.rating IS NOT NULL THEN
+        INSERT INTO event_feedback_rollup
+            (event_id, feedback_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+        VALUES
+            (NEW.event_id, 1, NEW.rating, NEW.rating = 1, NEW.rating = 2, NEW.rating = 3,
+             NEW.rating = 4, NEW.rating = 5)
+        ON DUPLICATE KEY UPDATE
+            feedback_count = feedback_count + 1,
+            rating_sum = rating_sum + NEW.rating,
+            rating_1 = rating_1 + (NEW.rating = 1),
+            rating_2 = rating_2 + (NEW.rating = 2),
+            rating_3 = rating_3 + (NEW.rating = 3),
+            rating_4 = rating_4 + (NEW.rating = 4),
+            rating_5 = rating_5 + (NEW.rating = 5);
+    END IF;
+END;//
+
+CREATE TRIGGER rollup_feedback_delete
+AFTER DELETE ON feedback
+FOR EACH ROW
+BEGIN
+    IF OLD.event_id IS NOT NULL AND OLD.rating IS NOT NULL THEN
+        UPDATE event_feedback_rollup
+        SET feedback_count = GREATEST(feedback_count - 1, 0),
+            rating_sum = GREATEST(rating_sum - OLD.rating, 0),
+            rating_1 = GREATEST(rating_1 - (OLD.rating = 1), 0),
+            rating_2 = GREATEST(rating_2 - (OLD.rating = 2), 0),
+            rating_3 = GREATEST(rating_3 - (OLD.rating = 3), 0),
+            rating_4 = GREATEST(rating_4 - (OLD.rating = 4), 0),
+            rating_5 = GREATEST(rating_5 - (OLD.rating = 5), 0)
+        WHERE event_id = OLD.event_id;
+    END IF;
+END;//
+DELIMITER ;
+
+INSERT INTO event_feedback_rollup
+    (event_id, feedback_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+SELECT event_id, COUNT(*), SUM(rating), SUM(rating = 1), SUM(rating = 2), SUM(rating = 3),
+       SUM(rating = 4), SUM(rating = 5)
+FROM feedback
+WHERE event_id IS NOT NULL AND rating IS NOT NULL
+GROUP BY event_id;
+
+-- migrate:down
+DROP TRIGGER IF EXISTS rollup_feedback_delete;
+
+DROP TRIGGER IF EXISTS rollup_feedback_insert;
+
+DROP TABLE IF EXISTS event_feedback_rollup;
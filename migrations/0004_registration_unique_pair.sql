@@ -0,0 +1,22 @@
+-- One registration per (event, student). register_student already checks
+-- for the pair under a row lock; the unique index makes it a guarantee and
+-- serves that lookup. Existing duplicates are removed first, keeping the
+-- earliest row; the delete trigger corrects event.registration_count.
+
+-- migrate:up
+DELETE dup
+FROM registration dup
+JOIN registration keep
+  ON keep.event_id = dup.event_id
+ AND keep.USN = dup.USN
+ AND keep.reg_id < dup.reg_id;
+
+ALTER TABLE registration
+    ADD UNIQUE INDEX uq_registration_event_usn (event_id, USN);
+
+-- migrate:down
+-- MySQL may have dropped the implicit index for the event_id foreign key
+-- once the unique index could serve it, so give the key its own index back.
+ALTER TABLE registration
+    ADD INDEX idx_registration_event (event_id),
+    DROP INDEX uq_registration_event_usn;
@@ -0,0 +1,40 @@
+-- Indexes matching the ORDER BY of the listings and exports, so they read
+-- rows in index order (and page with keyset ranges) instead of sorting:
+--   registrations dashboard / export     ORDER BY registration_date, reg_id
+--   per-event registrations              WHERE event_id ORDER BY registration_date, reg_id
+--   feedback dashboard / export          ORDER BY submitted_at, feedback_id
+--   per-event feedback                   WHERE event_id ORDER BY submitted_at, feedback_id
+--   public /events, dropdowns            ORDER BY date, time
+--   admin students list, name search     ORDER BY name, USN / name LIKE 'q%'
+
+-- migrate:up
+ALTER TABLE registration
+    ADD INDEX idx_registration_date (registration_date, reg_id),
+    ADD INDEX idx_registration_event_date (event_id, registration_date, reg_id);
+
+ALTER TABLE feedback
+    ADD INDEX idx_feedback_submitted (submitted_at, feedback_id),
+    ADD INDEX idx_feedback_event_submitted (event_id, submitted_at, feedback_id);
+
+ALTER TABLE event
+    ADD INDEX idx_event_date (date, time);
+
+ALTER TABLE student
+    ADD INDEX idx_student_name (name, USN);
+
+-- migrate:down
+ALTER TABLE student
+    DROP INDEX idx_student_name;
+
+ALTER TABLE event
+    DROP INDEX idx_event_date;
+
+-- Keep an index for the event_id foreign key (see 0004).
+ALTER TABLE feedback
+    ADD INDEX idx_feedback_event (event_id),
+    DROP INDEX idx_feedback_event_submitted,
+    DROP INDEX idx_feedback_submitted;
+
+ALTER TABLE registration
+    DROP INDEX idx_registration_event_date,
+    DROP INDEX idx_registration_date;
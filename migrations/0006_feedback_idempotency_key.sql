@@ -0,0 +1,13 @@
+-- Feedback queued by the write-behind ingester (portal_common/ingest.py) is
+-- delivered at least once; a replay after a crash carries the same key and
+-- the unique index turns it into a no-op. Rows written directly keep NULL.
+
+-- migrate:up
+ALTER TABLE feedback
+    ADD COLUMN idempotency_key CHAR(32) NULL,
+    ADD UNIQUE INDEX uq_feedback_idempotency_key (idempotency_key);
+
+-- migrate:down
+ALTER TABLE feedback
+    DROP INDEX uq_feedback_idempotency_key,
+    DROP COLUMN idempotency_key;
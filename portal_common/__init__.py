@@ -0,0 +1 @@
+"""Helpers shared by the public event portal and the admin portal."""
@@ -0,0 +1,206 @@
+"""Admission control for write routes under flash crowds.
+
+When a popular event opens, registration POSTs arrive faster than MySQL can
+commit them. Past a point, extra concurrency only adds lock waits on the
+event row and pool checkouts that time out together. ``AdmissionController``
+runs at most ``global_limit`` guarded requests at once, and at most
+``per_key_limit`` per key (the event being registered for). Registrations for
+one event serialize on its row lock anyway, so a hot event cannot take every
+slot from the others.
+
+A request that finds no free slot waits in a FIFO queue for up to
+``max_wait`` seconds. When a slot frees it goes to the oldest waiter that
+can use it. At most ``queue_size`` requests wait in total and at most
+``per_key_queue`` per key; beyond that, or once the deadline passes, the
+request is shed at once with ``429 Too Many Requests`` and a ``Retry-After``
+estimated from recent service times and the queue depth.
+
+Limits are per process. With several workers, size them so that
+``workers * global_limit`` stays within what the database sustains.
+"""
+from collections import deque
+from functools import wraps
+import math
+import os
+import threading
+import time
+
+from flask import request
+from werkzeug.exceptions import TooManyRequests
+
+GUARDED_METHODS = ("POST", "PUT", "PATCH", "DELETE")
+
+
+class _Waiter:
+    __slots__ = ("key", "granted")
+
+    def __init__(self, key):
+        self.key = key
+        self.granted = False
+
+
+class AdmissionController:
+    """Bounded concurrency with a short, fair wait queue; see the module docstring."""
+
+    def __init__(
+        self,
+        global_limit: int = 8,
+        per_key_limit: int = 2,
+        queue_size: int = 64,
+        per_key_queue: int = 16,
+        max_wait: float = 2.0,
+        max_retry_after: int = 30,
+    ):
+        self.global_limit = global_limit
+        self.per_key_limit = per_key_limit
+        self.queue_size = queue_size
+        self.per_key_queue = per_key_queue
+        self.max_wait = max_wait
+        self.max_retry_after = max_retry_after
+
+        self._cond = threading.Condition()
+        self._in_flight = 0
+        self._by_key = {}
+        self._waiters = deque()
+        self._waiting_by_key = {}
+        self._service_time = 0.05  # EWMA of seconds a slot is held
+        self._counters = {
+            "admitted": 0,
+            "queued": 0,
+            "shed_queue_full": 0,
+            "shed_timeout": 0,
+            "wait_seconds_total": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls, prefix: str = "ADMISSION_"):
+        return cls(
+            global_limit=int(os.getenv(prefix + "GLOBAL_LIMIT", "8")),
+            per_key_limit=int(os.getenv(prefix + "PER_EVENT_LIMIT", "2")),
+            queue_size=int(os.getenv(prefix + "QUEUE_SIZE", "64")),
+            per_key_queue=int(os.getenv(prefix + "PER_EVENT_QUEUE", "16")),
+            max_wait=float(os.getenv(prefix + "MAX_WAIT", "2")),
+        )
+
+    # --------------------------
+    # SLOTS
+    # --------------------------
+    def _has_room(self, key) -> bool:
+        return self._in_flight < self.global_limit and self._by_key.get(key, 0) < self.per_key_limit
+
+    def _take(self, key):
+        self._in_flight += 1
+        self._by_key[key] = self._by_key.get(key, 0) + 1
+
+    def _dequeue(self, waiter):
+        self._waiters.remove(waiter)
+        remaining = self._waiting_by_key[waiter.key] - 1
+        if remaining:
+            self._waiting_by_key[waiter.key] = remaining
+        else:
+            del self._waiting_by_key[waiter.key]
+
+    def _retry_after(self) -> int:
+        backlog = len(self._waiters) + self._in_flight
+        seconds = self._service_time * backlog / max(self.global_limit, 1)
+        return min(max(1, math.ceil(seconds)), self.max_retry_after)
+
+    def _shed(self, counter: str):
+        self._counters[counter] += 1
+        raise TooManyRequests(
+            "The server is busy with other registrations. Please try again shortly.",
+            retry_after=self._retry_after(),
+        )
+
+    def acquire(self, key=None):
+        """Take a slot for ``key`` or raise ``TooManyRequests``."""
+        with self._cond:
+            # Queued waiters never have room (release hands slots straight
+            # to them), so taking a free slot here does not jump the queue.
+            if self._has_room(key):
+                self._take(key)
+                self._counters["admitted"] += 1
+                return
+            if (
+                len(self._waiters) >= self.queue_size
+                or self._waiting_by_key.get(key, 0) >= self.per_key_queue
+            ):
+                self._shed("shed_queue_full")
+
+            waiter = _Waiter(key)
+            self._waiters.append(waiter)
+            self._waiting_by_key[key] = self._waiting_by_key.get(key, 0) + 1
+            began = time.monotonic()
+            deadline = began + self.max_wait
+            while not waiter.granted:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            self._counters["wait_seconds_total"] += time.monotonic() - began
+            if not waiter.granted:
+                self._dequeue(waiter)
+                self._shed("shed_timeout")
+            self._counters["queued"] += 1
+
+    def release(self, key=None, held: float = None):
+        with self._cond:
+            self._in_flight -= 1
+            count = self._by_key[key] - 1
+            if count:
+                self._by_key[key] = count
+            else:
+                del self._by_key[key]
+            if held is not None:
+                self._service_time += 0.2 * (held - self._service_time)
+
+            # Hand freed slots to the oldest waiters that can use them.
+            handed = False
+            for waiter in list(self._waiters):
+                if self._has_room(waiter.key):
+                    self._take(waiter.key)
+                    waiter.granted = True
+                    self._dequeue(waiter)
+                    handed = True
+                if self._in_flight >= self.global_limit:
+                    break
+            if handed:
+                self._cond.notify_all()
+
+    def limit(self, key_func=None):
+        """Guard a view's write requests; ``key_func()`` names the per-key bucket."""
+
+        def decorator(view):
+            @wraps(view)
+            def wrapped(*args, **kwargs):
+                if request.method not in GUARDED_METHODS:
+                    return view(*args, **kwargs)
+                key = key_func() if key_func is not None else None
+                self.acquire(key)
+                began = time.monotonic()
+                try:
+                    return view(*args, **kwargs)
+                finally:
+                    self.release(key, time.monotonic() - began)
+
+            return wrapped
+
+        return decorator
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._counters)
+            stats.update(
+                in_flight=self._in_flight,
+                waiting=len(self._waiters),
+                global_limit=self.global_limit,
+                per_key_limit=self.per_key_limit,
+                service_time_seconds=round(self._service_time, 4),
+            )
+        return stats
+
+    def init_app(self, app):
+        """Expose the counters through ``/metrics`` when metrics are enabled."""
+        registry = app.extensions.get("metrics")
+        if registry is not None:
+            registry.add_source("admission", self.stats)
@@ -0,0 +1,123 @@
+"""SQL-side aggregates for the admin dashboards' stat widgets.
+
+The stats are computed with ``GROUP BY`` queries over the same filters as
+the listing, independent of which page of rows is on screen. Filter
+clauses use the listing aliases: ``r`` (registration), ``e`` (event) and
+``s`` (student). Feedback stats come from ``event_feedback_rollup``.
+"""
+
+ALL_RATINGS = (1, 2, 3, 4, 5)
+
+# Feedback dashboard ``rating`` filter -> star ratings it covers.
+RATING_FILTERS = {
+    "good": (4, 5),
+    "average": (3,),
+    "poor": (1, 2),
+}
+
+REGISTRATION_FROM = """
+    FROM registration r
+    JOIN event e ON e.event_id = r.event_id
+    JOIN student s ON s.USN = r.USN
+"""
+
+
+def _where(clauses) -> str:
+    return " WHERE " + " AND ".join(f"({clause})" for clause in clauses) if clauses else ""
+
+
+def registration_stats(cursor, clauses=(), params=()) -> dict:
+    """Totals, department split, busiest event and latest registration.
+
+    ``cursor`` must be a dictionary cursor.
+    """
+    where = _where(clauses)
+    params = list(params)
+    stats = {}
+
+    cursor.execute(
+        "SELECT COUNT(*) AS visible, COUNT(DISTINCT r.USN) AS unique_students"
+        + REGISTRATION_FROM
+        + where,
+        params,
+    )
+    stats.update(cursor.fetchone())
+    if not stats["visible"]:
+        stats.update(per_department=[], busiest_event=None, latest_registration=None)
+        return stats
+
+    cursor.execute(
+        "SELECT COALESCE(s.department, 'Unknown') AS department, COUNT(*) AS total"
+        + REGISTRATION_FROM
+        + where
+        + " GROUP BY COALESCE(s.department, 'Unknown') ORDER BY total DESC, department ASC",
+        params,
+    )
+    stats["per_department"] = [(row["department"], row["total"]) for row in cursor.fetchall()]
+
+    cursor.execute(
+        "SELECT e.name, COUNT(*) AS total"
+        + REGISTRATION_FROM
+        + where
+        + " GROUP BY r.event_id, e.name ORDER BY total DESC, e.name ASC LIMIT 1",
+        params,
+    )
+    busiest = cursor.fetchone()
+    stats["busiest_event"] = (busiest["name"], busiest["total"]) if busiest else None
+
+    cursor.execute(
+        "SELECT r.reg_id, r.registration_date, e.name AS event_name, s.name AS student_name"
+        + REGISTRATION_FROM
+        + where
+        + " ORDER BY r.registration_date DESC, r.reg_id DESC LIMIT 1",
+        params,
+    )
+    stats["latest_registration"] = cursor.fetchone()
+    return stats
+
+
+def feedback_stats(cursor, ratings=ALL_RATINGS) -> tuple:
+    """Return ``(stats, rating_distribution)`` for the feedback dashboard.
+
+    Everything is derived from the per-event histograms in
+    ``event_feedback_rollup``, so the cost is O(events) whatever the size of
+    ``feedback``. ``ratings`` restricts the stats to those star ratings (see
+    ``RATING_FILTERS``). ``cursor`` must be a dictionary cursor.
+    """
+    ratings = tuple(int(rating) for rating in ratings if int(rating) in ALL_RATINGS)
+    cursor.execute(
+        "SELECT "
+        + ", ".join(f"COALESCE(SUM(rating_{r}), 0) AS r{r}" for r in ALL_RATINGS)
+        + " FROM event_feedback_rollup"
+    )
+    totals = cursor.fetchone()
+    rating_distribution = {
+        rating: int(totals[f"r{rating}"]) if rating in ratings else 0 for rating in ALL_RATINGS
+    }
+    total = sum(rating_distribution.values())
+    positive = rating_distribution[4] + rating_distribution[5]
+    stats = {
+        "total": total,
+        "avg_rating": (
+            round(sum(r * n for r, n in rating_distribution.items()) / total, 1) if total else None
+        ),
+        "positive_pct": int((positive / total) * 100) if total else 0,
+        "trending_event": None,
+    }
+
+    if total:
+        selected = " + ".join(f"fr.rating_{r}" for r in ratings)
+        cursor.execute(
+            f"""
+            SELECT e.name, {selected} AS total
+            FROM event_feedback_rollup fr
+            JOIN event e ON e.event_id = fr.event_id
+            ORDER BY total DESC, e.name ASC
+            LIMIT 1
+            """
+        )
+        trending = cursor.fetchone()
+        if trending and trending["total"]:
+            stats["trending_event"] = (trending["name"], int(trending["total"]))
+
+    return stats, rating_distribution
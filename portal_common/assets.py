@@ -0,0 +1,132 @@
+"""Fingerprinted, precompressed static assets.
+
+``build_assets`` (run at deploy time via ``flask build-assets``) copies each
+file in an app's static folder to ``dist/`` under a content-hashed name,
+writes ``.gz`` (and ``.br`` when the optional ``brotli`` package is
+installed) variants next to it, and records the mapping in
+``dist/manifest.json``. Templates link assets through ``asset_url()``; the
+hashed files are served with an immutable, year-long ``Cache-Control``, so
+repeat visits make no asset requests at all. Without a manifest (e.g. in
+development) ``asset_url`` falls back to the plain file.
+"""
+import gzip
+import hashlib
+import json
+import mimetypes
+import os
+import posixpath
+import shutil
+
+from flask import request, send_from_directory, url_for
+
+try:
+    import brotli
+except ImportError:  # optional: only gzip variants are built without it
+    brotli = None
+
+DIST_DIR = "dist"
+MANIFEST_NAME = "manifest.json"
+ASSET_EXTENSIONS = (".css", ".js", ".svg", ".png", ".jpg", ".ico", ".woff2")
+COMPRESSIBLE_EXTENSIONS = (".css", ".js", ".svg")
+IMMUTABLE_MAX_AGE = 365 * 24 * 3600
+
+# Preferred first.
+_ENCODINGS = (("br", ".br"), ("gzip", ".gz"))
+
+
+def _fingerprint(path: str) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fh:
+        for block in iter(lambda: fh.read(65536), b""):
+            digest.update(block)
+    return digest.hexdigest()[:12]
+
+
+def build_assets(static_folder: str) -> dict:
+    """Fingerprint and precompress the assets in ``static_folder``.
+
+    Returns the manifest (logical name -> hashed name, both relative to the
+    static folder). Stale builds are removed first.
+    """
+    dist = os.path.join(static_folder, DIST_DIR)
+    shutil.rmtree(dist, ignore_errors=True)
+    os.makedirs(dist)
+
+    manifest = {}
+    for root, dirs, files in os.walk(static_folder):
+        dirs[:] = sorted(d for d in dirs if os.path.join(root, d) != dist)
+        for name in sorted(files):
+            stem, ext = os.path.splitext(name)
+            if ext not in ASSET_EXTENSIONS:
+                continue
+            source = os.path.join(root, name)
+            logical = os.path.relpath(source, static_folder).replace(os.sep, "/")
+            hashed = posixpath.join(
+                DIST_DIR, posixpath.dirname(logical), f"{stem}.{_fingerprint(source)}{ext}"
+            )
+
+            target = os.path.join(static_folder, hashed)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            shutil.copyfile(source, target)
+            if ext in COMPRESSIBLE_EXTENSIONS:
+                with open(source, "rb") as fh:
+                    data = fh.read()
+                with open(target + ".gz", "wb") as fh:
+                    fh.write(gzip.compress(data, compresslevel=9, mtime=0))
+                if brotli is not None:
+                    with open(target + ".br", "wb") as fh:
+                        fh.write(brotli.compress(data, quality=11))
+            manifest[logical] = hashed
+
+    with open(os.path.join(dist, MANIFEST_NAME), "w") as fh:
+        json.dump(manifest, fh, indent=2, sort_keys=True)
+    return manifest
+
+
+def load_manifest(static_folder: str) -> dict:
+    try:
+        with open(os.path.join(static_folder, DIST_DIR, MANIFEST_NAME)) as fh:
+            return json.load(fh)
+    except FileNotFoundError:
+        return {}
+
+
+def init_app(app):
+    """Register ``asset_url()`` and serve built assets as immutable."""
+    manifest = load_manifest(app.static_folder)
+    hashed_files = set(manifest.values())
+    app.extensions["asset_manifest"] = manifest
+
+    @app.template_global()
+    def asset_url(filename: str) -> str:
+        return url_for("static", filename=manifest.get(filename, filename))
+
+    serve_default = app.view_functions["static"]
+
+    def static(filename):
+        if filename not in hashed_files:
+            return serve_default(filename=filename)
+
+        accepted = request.accept_encodings
+        for encoding, suffix in _ENCODINGS:
+            if accepted[encoding] and os.path.isfile(os.path.join(app.static_folder, filename + suffix)):
+                break
+        else:
+            encoding, suffix = None, ""
+
+        response = send_from_directory(
+            app.static_folder,
+            filename + suffix,
+            mimetype=mimetypes.guess_type(filename)[0],
+            max_age=IMMUTABLE_MAX_AGE,
+            conditional=True,
+        )
+        if encoding:
+            response.headers["Content-Encoding"] = encoding
+        response.vary.add("Accept-Encoding")
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
+
+    app.view_functions["static"] = static
+
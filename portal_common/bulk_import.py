@@ -0,0 +1,184 @@
+"""Chunked CSV import of event registrations.
+
+Rows are read lazily from any iterable of text lines, so large uploads never
+sit fully in memory. Each chunk is validated with a handful of set-based
+queries, inserted with one ``executemany`` and committed on its own.
+
+Because chunks commit as they go, a file that turns out to be unreadable
+part-way through (bad encoding, a malformed or oversized field) does not
+abort the import: reading stops there, the chunks before it stay imported,
+and the report says where and why it stopped.
+"""
+from contextlib import closing
+import csv
+from itertools import islice
+import re
+
+from mysql.connector import Error
+
+IMPORT_CHUNK_SIZE = 1000
+ERROR_REPORT_HEADER = ["Line", "USN", "Event", "Problem"]
+
+
+class ImportFormatError(ValueError):
+    """The uploaded file is not a usable registrations CSV."""
+
+
+def write_error_report(errors, fh):
+    """Write a report's ``errors`` to ``fh`` as CSV, one rejected row per line."""
+    writer = csv.writer(fh)
+    writer.writerow(ERROR_REPORT_HEADER)
+    writer.writerows(errors)
+
+
+def _placeholders(values) -> str:
+    return ", ".join(["%s"] * len(values))
+
+
+def _parse_id(value):
+    value = (value or "").strip()
+    # ASCII digits only: str.isdigit() accepts e.g. "²", which int() rejects.
+    return int(value) if re.fullmatch(r"[0-9]+", value) else None
+
+
+def _numbered_rows(reader, report):
+    """Yield ``(line, row)`` until the end of the file or the first unreadable row."""
+    line = 1
+    while True:
+        line += 1
+        try:
+            row = next(reader)
+        except StopIteration:
+            return
+        except (csv.Error, UnicodeDecodeError) as err:
+            report["file_error"] = f"Stopped reading at line {line}: {err}"
+            return
+        yield line, row
+
+
+def import_registrations(
+    conn, lines, default_event_id: int = None, chunk_size: int = IMPORT_CHUNK_SIZE
+) -> dict:
+    """Import registrations from CSV ``lines`` and return a per-row report.
+
+    The CSV needs a ``USN`` column and may carry an ``event_id`` column;
+    rows without one use ``default_event_id``. The report is a dict with
+    ``rows``, ``imported``, ``errors`` (a list of ``(line, usn, event_id,
+    message)`` tuples, ``line`` counting the header as line 1) and
+    ``file_error``, which describes where reading stopped early, or is
+    ``None``. Raises ``ImportFormatError`` only if the header is unusable,
+    before anything is imported.
+    """
+    reader = csv.reader(lines)
+    try:
+        header = [column.strip().lower() for column in next(reader, [])]
+    except (csv.Error, UnicodeDecodeError) as err:
+        raise ImportFormatError(f"Could not read the header row: {err}") from err
+    if "usn" not in header:
+        raise ImportFormatError("CSV must have a header row with a USN column")
+    usn_col = header.index("usn")
+    event_col = header.index("event_id") if "event_id" in header else None
+
+    # Each chunk must start a fresh transaction so its reads are not served
+    # from a snapshot taken before the event rows were locked.
+    conn.rollback()
+
+    report = {"rows": 0, "imported": 0, "errors": [], "file_error": None}
+    seen = set()
+    numbered = _numbered_rows(reader, report)
+    while True:
+        chunk = list(islice(numbered, chunk_size))
+        if not chunk:
+            break
+
+        candidates = []
+        for line, row in chunk:
+            if not any(cell.strip() for cell in row):
+                continue
+            report["rows"] += 1
+            usn_raw = row[usn_col] if usn_col < len(row) else ""
+            event_raw = row[event_col] if event_col is not None and event_col < len(row) else ""
+            usn = _parse_id(usn_raw)
+            event_id = _parse_id(event_raw) if event_raw.strip() else default_event_id
+
+            if usn is None:
+                report["errors"].append((line, usn_raw, event_raw, "USN must be numeric"))
+            elif event_id is None:
+                report["errors"].append((line, usn_raw, event_raw, "Missing or invalid event ID"))
+            elif (event_id, usn) in seen:
+                report["errors"].append((line, usn, event_id, "Duplicate row in file"))
+            else:
+                seen.add((event_id, usn))
+                candidates.append((line, event_id, usn))
+
+        if not candidates:
+            continue
+        try:
+            imported, chunk_errors = _import_chunk(conn, candidates)
+        except Error as err:
+            conn.rollback()
+            report["errors"].extend(
+                (line, usn, event_id, f"Database error: {err}") for line, event_id, usn in candidates
+            )
+        else:
+            report["imported"] += imported
+            report["errors"].extend(chunk_errors)
+
+    report["errors"].sort(key=lambda error: error[0])
+    return report
+
+
+def _import_chunk(conn, candidates: list) -> tuple:
+    usns = sorted({usn for _, _, usn in candidates})
+    event_ids = sorted({event_id for _, event_id, _ in candidates})
+
+    with closing(conn.cursor()) as cursor:
+        # Lock the events (in id order) first so public registrations for them
+        # wait until this chunk commits, and the reads below see their rows.
+        cursor.execute(
+            f"""
+            SELECT event_id, max_seats, IFNULL(registration_count, 0)
+            FROM event
+            WHERE event_id IN ({_placeholders(event_ids)})
+            ORDER BY event_id
+            FOR UPDATE
+            """,
+            event_ids,
+        )
+        remaining = {
+            event_id: (None if max_seats is None else max_seats - registered)
+            for event_id, max_seats, registered in cursor.fetchall()
+        }
+
+        cursor.execute(
+            f"""
+            SELECT event_id, USN FROM registration
+            WHERE event_id IN ({_placeholders(event_ids)}) AND USN IN ({_placeholders(usns)})
+            """,
+            event_ids + usns,
+        )
+        existing = set(cursor.fetchall())
+
+        cursor.execute(f"SELECT USN FROM student WHERE USN IN ({_placeholders(usns)})", usns)
+        known_students = {row[0] for row in cursor.fetchall()}
+
+        rows = []
+        errors = []
+        for line, event_id, usn in candidates:
+            if event_id not in remaining:
+                errors.append((line, usn, event_id, "Event not found"))
+            elif usn not in known_students:
+                errors.append((line, usn, event_id, "Student not found"))
+            elif (event_id, usn) in existing:
+                errors.append((line, usn, event_id, "Student already registered for this event"))
+            elif remaining[event_id] is not None and remaining[event_id] <= 0:
+                errors.append((line, usn, event_id, "Event is already at capacity"))
+            else:
+                if remaining[event_id] is not None:
+                    remaining[event_id] -= 1
+                rows.append((event_id, usn))
+
+        if rows:
+            cursor.executemany("INSERT INTO registration (event_id, USN) VALUES (%s, %s)", rows)
+    conn.commit()
+    return len(rows), errors
@@ -0,0 +1,58 @@
+"""In-process snapshot cache for expensive, rarely-changing query results."""
+import threading
+import time
+
+
+class SnapshotCache:
+    """Cache one value produced by ``loader`` for ``ttl`` seconds.
+
+    ``invalidate()`` marks the snapshot stale immediately (call it after a
+    commit that changes the underlying data). When the snapshot is stale,
+    only one caller runs ``loader``; concurrent callers wait for that result
+    instead of hitting the database themselves. Loader exceptions propagate
+    and nothing is cached.
+
+    ``version`` is an optional callable returning the current data version
+    (see ``DataVersion.current``); a snapshot taken at another version is
+    stale, which also catches writes made by other processes.
+    """
+
+    def __init__(self, loader, ttl: float = 30.0, clock=time.monotonic, version=None):
+        self._loader = loader
+        self._version = version
+        self.ttl = ttl
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._value = None
+        self._expires_at = 0.0
+        self._generation = 0
+        self._loaded_generation = -1
+        self._loaded_version = None
+
+    def _fresh(self, version) -> bool:
+        return (
+            self._loaded_generation == self._generation
+            and self._loaded_version == version
+            and self._clock() < self._expires_at
+        )
+
+    def get(self):
+        version = self._version() if self._version else None
+        if self._fresh(version):
+            return self._value
+
+        with self._lock:
+            # Another caller may have refreshed while we waited for the lock.
+            if self._fresh(version):
+                return self._value
+            generation = self._generation
+            value = self._loader()
+            self._value = value
+            self._expires_at = self._clock() + self.ttl
+            self._loaded_generation = generation
+            self._loaded_version = version
+            return value
+
+    def invalidate(self):
+        # Bumping the generation also discards a load that is still in flight.
+        self._generation += 1
@@ -0,0 +1,116 @@
+"""Data-version tracking and conditional GET (ETag / Last-Modified).
+
+Every committed write bumps one shared data version. Read-only pages derive
+their validators from it, so a reload with nothing changed is answered with
+``304 Not Modified`` before the view runs: no MySQL, no template rendering.
+"""
+from datetime import date, datetime, timezone
+from functools import wraps
+import hashlib
+import os
+import tempfile
+import time
+
+from flask import make_response, request, session
+from flask.globals import request_ctx
+
+from .routing import read_unsettled
+
+DEFAULT_VERSION_FILE = os.path.join(tempfile.gettempdir(), "event_portal.data_version")
+
+
+class DataVersion:
+    """Version of the portal's data, kept in a small file.
+
+    A file (rather than a process-local counter) lets the public app, the
+    admin app and every worker process share one version, so deleting an
+    event in the admin portal also invalidates the public ``/events`` page.
+    Reading it is a single small file read per request.
+    """
+
+    def __init__(self, path: str = DEFAULT_VERSION_FILE):
+        self.path = path
+
+    @classmethod
+    def from_env(cls, var: str = "DATA_VERSION_FILE"):
+        return cls(os.getenv(var, DEFAULT_VERSION_FILE))
+
+    def bump(self) -> str:
+        """Record that the data changed; returns the new version."""
+        version = f"{time.time_ns()}-{os.getpid()}"
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(self.path) or ".", prefix=".data_version.")
+        with os.fdopen(fd, "w") as fh:
+            fh.write(version)
+        os.replace(tmp, self.path)
+        return version
+
+    def current(self) -> str:
+        try:
+            with open(self.path) as fh:
+                version = fh.read().strip()
+        except FileNotFoundError:
+            version = ""
+        return version or self.bump()
+
+    def written_at(self) -> float:
+        """Unix time of the latest bump."""
+        return int(self.current().split("-", 1)[0]) / 1_000_000_000
+
+    @staticmethod
+    def modified_at(version: str) -> datetime:
+        seconds = int(version.split("-", 1)[0]) // 1_000_000_000
+        return datetime.fromtimestamp(seconds, tz=timezone.utc)
+
+
+def _flashes_pending() -> bool:
+    return "_flashes" in session or bool(getattr(request_ctx, "flashes", None))
+
+
+def conditional(data_version: DataVersion):
+    """Decorator adding ETag / Last-Modified validation to a GET view.
+
+    The ETag covers the data version, the full URL (so each filter and page
+    has its own), the logged-in admin and today's date, since pages such as
+    the upcoming-events counts depend on it. Last-Modified is likewise never
+    earlier than today's midnight. Responses carrying flash messages are
+    never validated, since the message must be shown exactly once, and
+    neither are pages read from a replica that may not have the latest write
+    yet (see ``routing.read_unsettled``).
+    """
+
+    def decorator(fn):
+        @wraps(fn)
+        def wrapper(*args, **kwargs):
+            if request.method not in ("GET", "HEAD") or _flashes_pending():
+                return fn(*args, **kwargs)
+
+            version = data_version.current()
+            today = date.today()
+            key = "\0".join(
+                (version, today.isoformat(), request.full_path, str(session.get("admin_username", "")))
+            )
+            etag = hashlib.blake2b(key.encode("utf-8"), digest_size=12).hexdigest()
+            midnight = datetime(today.year, today.month, today.day).astimezone(timezone.utc)
+            modified_at = max(DataVersion.modified_at(version), midnight)
+
+            if request.if_none_match:
+                current = request.if_none_match.contains_weak(etag)
+            else:
+                current = bool(request.if_modified_since) and modified_at <= request.if_modified_since
+            if current:
+                response = make_response("", 304)
+            else:
+                response = make_response(fn(*args, **kwargs))
+                if response.status_code != 200 or _flashes_pending() or read_unsettled():
+                    return response
+
+            # Weak, because compression may change the bytes but not the page.
+            response.set_etag(etag, weak=True)
+            response.last_modified = modified_at
+            response.headers["Cache-Control"] = "private, no-cache"
+            response.vary.add("Cookie")
+            return response
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,42 @@
+"""Maintenance for the trigger-maintained ``event.registration_count`` column."""
+from contextlib import closing
+
+DRIFT_SQL = """
+    SELECT e.event_id,
+           IFNULL(e.registration_count, 0) AS stored,
+           COUNT(r.reg_id) AS actual
+    FROM event e
+    LEFT JOIN registration r ON r.event_id = e.event_id
+    GROUP BY e.event_id, e.registration_count
+    HAVING stored <> actual
+    ORDER BY e.event_id
+"""
+
+REPAIR_SQL = """
+    UPDATE event e
+    SET e.registration_count = (
+        SELECT COUNT(*) FROM registration r WHERE r.event_id = e.event_id
+    )
+    WHERE e.event_id = %s
+"""
+
+
+def find_count_drift(conn) -> list:
+    """Return ``{"event_id", "stored", "actual"}`` rows whose counter is wrong."""
+    with closing(conn.cursor(dictionary=True)) as cursor:
+        cursor.execute(DRIFT_SQL)
+        return cursor.fetchall()
+
+
+def reconcile_registration_counts(conn, repair: bool = True) -> list:
+    """Detect counter drift and, if ``repair``, recount the affected events.
+
+    The repair recomputes the count inside the UPDATE itself, so registrations
+    that land between detection and repair are still counted correctly.
+    """
+    drift = find_count_drift(conn)
+    if drift and repair:
+        with closing(conn.cursor()) as cursor:
+            cursor.executemany(REPAIR_SQL, [(row["event_id"],) for row in drift])
+        conn.commit()
+    return drift
@@ -0,0 +1,260 @@
+"""Thread-safe MySQL connection pool shared by both portals.
+
+Handlers keep calling ``conn.close()`` as before; the pooled connection hands
+itself back to the pool instead of tearing down the socket.
+"""
+from collections import deque
+import os
+import threading
+import time
+
+import mysql.connector
+from mysql.connector import Error
+from mysql.connector.errors import PoolError
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+class PooledConnection:
+    """Proxy around a raw connection whose ``close()`` returns it to the pool."""
+
+    def __init__(self, pool, raw, created_at: float):
+        self._pool = pool
+        self._raw = raw
+        self._created_at = created_at
+
+    @property
+    def raw(self):
+        return self._raw
+
+    def cursor(self, *args, **kwargs):
+        if self._raw is None:
+            raise PoolError("Connection has already been returned to the pool")
+        cursor = self._raw.cursor(*args, **kwargs)
+        wrapper = self._pool.cursor_wrapper
+        return wrapper(cursor) if wrapper is not None else cursor
+
+    def close(self):
+        if self._raw is None:
+            return
+        raw, self._raw = self._raw, None
+        self._pool._release(raw, self._created_at)
+
+    def __getattr__(self, name):
+        if self._raw is None:
+            raise PoolError("Connection has already been returned to the pool")
+        return getattr(self._raw, name)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ConnectionPool:
+    """Fixed-size pool with bounded overflow, checkout timeouts and recycling.
+
+    ``size`` connections are kept idle between requests; up to
+    ``max_overflow`` extra connections may be opened under load and are closed
+    as soon as they are returned. Borrowers wait at most ``timeout`` seconds
+    before a ``PoolError`` is raised. With ``pre_ping`` a connection that sat
+    idle for at least ``ping_interval`` seconds is pinged before reuse; one
+    handed back moments ago is reused without the extra round trip.
+
+    ``cursor_wrapper``, if set, is applied to every cursor opened on a
+    borrowed connection (used for query instrumentation).
+    """
+
+    def __init__(
+        self,
+        config: dict,
+        size: int = 5,
+        max_overflow: int = 10,
+        timeout: float = 5.0,
+        recycle: float = 3600.0,
+        pre_ping: bool = True,
+        ping_interval: float = 1.0,
+        connect=None,
+    ):
+        self.config = dict(config)
+        self.size = max(size, 1)
+        self.max_overflow = max(max_overflow, 0)
+        self.timeout = timeout
+        self.recycle = recycle
+        self.pre_ping = pre_ping
+        self.ping_interval = ping_interval
+        self._connect = connect or mysql.connector.connect
+        self.cursor_wrapper = None
+
+        self._cond = threading.Condition()
+        self._idle = deque()
+        self._open = 0
+        self._in_use = 0
+        self._waiting = 0
+        self._counters = {
+            "created": 0,
+            "closed": 0,
+            "checkouts": 0,
+            "timeouts": 0,
+            "recycled": 0,
+            "invalidated": 0,
+            "wait_time_total": 0.0,
+            "wait_time_max": 0.0,
+        }
+
+    @classmethod
+    def from_env(cls, config: dict, prefix: str = "DB_POOL_", **overrides):
+        """Build a pool sized from ``DB_POOL_*`` environment variables."""
+        options = {
+            "size": _env_int(prefix + "SIZE", 5),
+            "max_overflow": _env_int(prefix + "MAX_OVERFLOW", 10),
+            "timeout": _env_float(prefix + "TIMEOUT", 5.0),
+            "recycle": _env_float(prefix + "RECYCLE", 3600.0),
+            "pre_ping": os.getenv(prefix + "PRE_PING", "1").lower() not in ("0", "false", "no"),
+            "ping_interval": _env_float(prefix + "PING_INTERVAL", 1.0),
+        }
+        options.update(overrides)
+        return cls(config, **options)
+
+    # --------------------------
+    # CHECKOUT / CHECKIN
+    # --------------------------
+    def acquire(self, timeout: float = None) -> PooledConnection:
+        """Borrow a validated connection, opening a new one if allowed."""
+        timeout = self.timeout if timeout is None else timeout
+        started = time.monotonic()
+        deadline = started + timeout
+
+        with self._cond:
+            self._waiting += 1
+            try:
+                while True:
+                    if self._idle:
+                        raw, created_at, idle_since = self._idle.pop()
+                        break
+                    if self._open < self.size + self.max_overflow:
+                        raw, created_at = None, None
+                        self._open += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._counters["timeouts"] += 1
+                        raise PoolError(
+                            f"Timed out after {timeout:.1f}s waiting for a database connection"
+                        )
+                    self._cond.wait(remaining)
+            finally:
+                self._waiting -= 1
+            self._in_use += 1
+
+        try:
+            if raw is not None:
+                raw, created_at = self._validate(raw, created_at, idle_since)
+            if raw is None:
+                raw, created_at = self._create(), time.monotonic()
+        except BaseException:
+            with self._cond:
+                self._in_use -= 1
+                self._open -= 1
+                self._cond.notify()
+            raise
+
+        waited = time.monotonic() - started
+        with self._cond:
+            self._counters["checkouts"] += 1
+            self._counters["wait_time_total"] += waited
+            self._counters["wait_time_max"] = max(self._counters["wait_time_max"], waited)
+        return PooledConnection(self, raw, created_at)
+
+    def _create(self):
+        raw = self._connect(**self.config)
+        with self._cond:
+            self._counters["created"] += 1
+        return raw
+
+    def _validate(self, raw, created_at: float, idle_since: float):
+        """Return ``(raw, created_at)`` or ``(None, None)`` if it must be replaced."""
+        now = time.monotonic()
+        if self.recycle and now - created_at > self.recycle:
+            self._discard(raw, "recycled")
+            return None, None
+        if self.pre_ping and now - idle_since >= self.ping_interval:
+            try:
+                alive = raw.is_connected()
+            except Error:
+                alive = False
+            if not alive:
+                self._discard(raw, "invalidated")
+                return None, None
+        return raw, created_at
+
+    def _discard(self, raw, reason: str = None):
+        try:
+            raw.close()
+        except Error:
+            pass
+        with self._cond:
+            self._counters["closed"] += 1
+            if reason:
+                self._counters[reason] += 1
+
+    def _release(self, raw, created_at: float):
+        healthy = True
+        try:
+            if raw.in_transaction:
+                raw.rollback()
+        except Error:
+            healthy = False
+
+        with self._cond:
+            self._in_use -= 1
+            keep = healthy and len(self._idle) < self.size
+            if keep:
+                self._idle.append((raw, created_at, time.monotonic()))
+            else:
+                self._open -= 1
+            self._cond.notify()
+
+        if not keep:
+            self._discard(raw, None if healthy else "invalidated")
+
+    # --------------------------
+    # INTROSPECTION
+    # --------------------------
+    def stats(self) -> dict:
+        """Snapshot of pool occupancy and lifetime counters."""
+        with self._cond:
+            counters = dict(self._counters)
+            checkouts = counters["checkouts"]
+            return {
+                "size": self.size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                **counters,
+                "wait_time_avg": counters["wait_time_total"] / checkouts if checkouts else 0.0,
+            }
+
+    def dispose(self):
+        """Close every idle connection; in-use ones close when returned."""
+        with self._cond:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+        for raw, _, _ in idle:
+            self._discard(raw)
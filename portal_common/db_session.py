@@ -0,0 +1,52 @@
+"""Request-scoped database connection tied to Flask's ``g``.
+
+The first call to ``get_db()`` during a request borrows a connection from the
+pool; every later call in the same request (handlers and helpers alike) gets
+that same connection. At teardown the transaction is rolled back if the
+request raised, committed otherwise, and the connection goes back to the pool.
+"""
+from flask import current_app, g
+from mysql.connector import Error
+
+_MISSING = object()
+
+
+def init_app(app, pool):
+    """Register ``pool`` as the source for ``get_db()`` on ``app``."""
+    app.extensions["db_pool"] = pool
+    app.teardown_appcontext(_teardown_db)
+
+
+def get_db():
+    """Return the request's connection, opening it on first use.
+
+    Returns ``None`` if the pool cannot hand out a connection; the failure is
+    remembered so later callers in the same request do not wait again.
+    """
+    conn = g.get("_db_conn", _MISSING)
+    if conn is not _MISSING:
+        return conn
+
+    try:
+        conn = current_app.extensions["db_pool"].acquire()
+    except Error as err:
+        current_app.logger.error("Database connection failed: %s", err)
+        conn = None
+    g._db_conn = conn
+    return conn
+
+
+def _teardown_db(exc):
+    conn = g.pop("_db_conn", None)
+    if conn is None:
+        return
+
+    try:
+        if exc is not None:
+            conn.rollback()
+        elif conn.in_transaction:
+            conn.commit()
+    except Error as err:
+        current_app.logger.error("Failed to finish request transaction: %s", err)
+    finally:
+        conn.close()
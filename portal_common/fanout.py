@@ -0,0 +1,97 @@
+"""Run independent read queries concurrently on pooled connections."""
+from concurrent.futures import ThreadPoolExecutor, wait
+from contextlib import closing
+import contextvars
+import logging
+import os
+import re
+
+from mysql.connector import Error
+
+logger = logging.getLogger(__name__)
+
+_SELECT_RE = re.compile(r"^\s*SELECT\b", re.IGNORECASE)
+
+
+class QueryTimeout(Error):
+    """A fanned-out query did not finish within its deadline."""
+
+
+class QueryFanout:
+    """Thread pool that executes named read queries in parallel.
+
+    Each query borrows its own connection from ``pool``, so a page that needs
+    four independent aggregates waits for the slowest one instead of the sum
+    of all four. Queries that fail or exceed ``timeout`` are reported
+    separately so callers can render partial results. SELECTs also carry a
+    ``MAX_EXECUTION_TIME`` hint so the server abandons them at the deadline
+    instead of holding the connection.
+    """
+
+    def __init__(self, pool, max_workers: int = 8, timeout: float = 2.0):
+        self.pool = pool
+        self.timeout = timeout
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="db-fanout")
+
+    @classmethod
+    def from_env(cls, pool, prefix: str = "DB_FANOUT_"):
+        return cls(
+            pool,
+            max_workers=int(os.getenv(prefix + "WORKERS", "8")),
+            timeout=float(os.getenv(prefix + "TIMEOUT", "2.0")),
+        )
+
+    def _run(self, sql: str, params, timeout: float) -> list:
+        if _SELECT_RE.match(sql):
+            sql = _SELECT_RE.sub(f"SELECT /*+ MAX_EXECUTION_TIME({int(timeout * 1000)}) */", sql, 1)
+        conn = self.pool.acquire(timeout=timeout)
+        try:
+            with closing(conn.cursor()) as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+        finally:
+            conn.close()
+
+    def gather(self, queries: dict, timeout: float = None) -> tuple:
+        """Run ``{name: (sql, params)}`` concurrently.
+
+        Returns ``(results, failed)``: ``results`` maps names to row tuples
+        for the queries that succeeded, ``failed`` maps the rest to the
+        error (``QueryTimeout`` if the deadline passed first).
+        """
+        timeout = self.timeout if timeout is None else timeout
+        # Copy the caller's context so per-request instrumentation sees the
+        # queries run on worker threads.
+        futures = {
+            name: self._executor.submit(contextvars.copy_context().run, self._run, sql, params, timeout)
+            for name, (sql, params) in queries.items()
+        }
+        wait(futures.values(), timeout=timeout)
+
+        results, failed = {}, {}
+        for name, future in futures.items():
+            if not future.done():
+                future.cancel()
+                failed[name] = QueryTimeout(f"Query {name!r} exceeded {timeout:.1f}s")
+                continue
+            try:
+                results[name] = future.result()
+            except Error as err:
+                failed[name] = err
+
+        for name, err in failed.items():
+            logger.warning("Fan-out query %s failed: %s", name, err)
+        return results, failed
+
+    def gather_scalars(self, queries: dict, defaults: dict = None, timeout: float = None) -> tuple:
+        """Like ``gather`` but returns the first column of the first row.
+
+        Failed queries fall back to ``defaults[name]`` (or ``None``).
+        """
+        defaults = defaults or {}
+        results, failed = self.gather(queries, timeout)
+        values = {}
+        for name in queries:
+            rows = results.get(name)
+            values[name] = rows[0][0] if rows else defaults.get(name)
+        return values, failed
@@ -0,0 +1,377 @@
+"""Write-behind ingestion of feedback through a durable local queue.
+
+``FeedbackQueue.enqueue`` appends a validated submission to an append-only
+segment file in ``directory`` and waits for it to be fsynced, so the
+student sees the success page as soon as the record is on disk rather than
+after a MySQL commit. Concurrent submissions share fsyncs (group commit).
+A background flusher periodically seals the active segment, bulk-inserts
+its records in batches of ``batch_size`` and deletes it.
+
+Delivery is at-least-once: a crash between the insert and the delete
+replays the segment on the next start. Every record carries an idempotency
+key (``feedback.idempotency_key``, unique, added by migration 0006), so a
+replay inserts nothing twice. Records are streamed from disk when flushed,
+and at most ``max_pending`` may wait unflushed; beyond that ``enqueue``
+returns ``False`` and the caller writes synchronously instead.
+
+Each process writes its own segments and holds an ``flock`` on them. At
+start-up, ``recover`` claims the segments no live process holds, such as
+those of a crashed worker, and flushes them. POSIX only.
+"""
+from collections import deque
+import fcntl
+import glob
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+
+from mysql.connector import DataError, Error, IntegrityError
+
+logger = logging.getLogger(__name__)
+
+# submitted_at is left to the column default, so queued rows are stamped by
+# the database clock at flush exactly like directly inserted ones.
+INSERT_SQL = """
+    INSERT INTO feedback (event_id, USN, rating, comment, idempotency_key)
+    VALUES (%s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE idempotency_key = idempotency_key
+"""
+
+
+def new_idempotency_key() -> str:
+    return uuid.uuid4().hex
+
+
+class FeedbackQueue:
+    """Durable, bounded write-behind queue for feedback rows."""
+
+    def __init__(
+        self,
+        directory: str,
+        pool,
+        batch_size: int = 500,
+        flush_interval: float = 1.0,
+        max_pending: int = 50_000,
+        fsync: bool = True,
+        on_flush=None,
+    ):
+        self.directory = directory
+        self.pool = pool
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.max_pending = max_pending
+        self.fsync = fsync
+        self.on_flush = on_flush
+        os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._sync_cond = threading.Condition()
+        self._flush_lock = threading.Lock()  # one flusher at a time
+        self._written = 0  # records written to segment files so far
+        self._synced = 0  # ... of which known to be on disk
+        self._syncing = False
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._active = None
+        self._active_count = 0
+        self._sealed = deque()  # (locked file object, record count)
+        self._pending = 0
+        self._sequence = 0
+        self._thread = None
+        self._counters = {"enqueued": 0, "rejected": 0, "flushed": 0, "duplicates": 0, "dropped": 0, "failed_flushes": 0}
+
+    @classmethod
+    def from_env(cls, pool, prefix: str = "FEEDBACK_QUEUE_", **kwargs):
+        """Build a queue if ``FEEDBACK_QUEUE_DIR`` is set, else return ``None``."""
+        directory = os.getenv(prefix + "DIR")
+        if not directory:
+            return None
+        return cls(
+            directory,
+            pool,
+            batch_size=int(os.getenv(prefix + "BATCH_SIZE", "500")),
+            flush_interval=float(os.getenv(prefix + "FLUSH_INTERVAL", "1.0")),
+            max_pending=int(os.getenv(prefix + "MAX_PENDING", "50000")),
+            fsync=os.getenv(prefix + "FSYNC", "1").lower() not in ("0", "false", "no"),
+            **kwargs,
+        )
+
+    # --------------------------
+    # PRODUCER
+    # --------------------------
+    def enqueue(self, event_id: int, usn: int, rating: int, comment) -> bool:
+        """Durably queue one submission; ``False`` if the queue is full."""
+        record = {
+            "key": new_idempotency_key(),
+            "event_id": event_id,
+            "usn": usn,
+            "rating": rating,
+            "comment": comment,
+        }
+        line = json.dumps(record, separators=(",", ":")) + "\n"
+
+        with self._lock:
+            if self._pending >= self.max_pending:
+                self._counters["rejected"] += 1
+                return False
+            if self._active is None:
+                self._active = self._open_segment()
+            self._active.write(line)
+            self._active.flush()
+            self._written += 1
+            ticket = self._written
+            self._active_count += 1
+            self._pending += 1
+            self._counters["enqueued"] += 1
+            full = self._active_count >= self.batch_size
+
+        if self.fsync:
+            self._sync(ticket)
+        self._ensure_flusher()
+        if full:
+            self._wake.set()
+        return True
+
+    def _sync(self, ticket: int):
+        """Return once record ``ticket`` is on disk (group commit).
+
+        One caller at a time fsyncs the active segment. That covers every
+        record written before it started, so callers arriving meanwhile
+        wait for it, or for the next one, instead of each paying their own
+        fsync.
+        """
+        with self._sync_cond:
+            while True:
+                if self._synced >= ticket:
+                    return
+                if not self._syncing:
+                    self._syncing = True
+                    break
+                self._sync_cond.wait()
+
+        synced = None
+        try:
+            with self._lock:
+                fh, target = self._active, self._written
+            if fh is not None:
+                try:
+                    os.fsync(fh.fileno())
+                except (OSError, ValueError):
+                    # Sealed segments are fsynced by _seal and only closed
+                    # once their rows are in MySQL.
+                    if not fh.closed:
+                        raise
+            synced = target
+        finally:
+            with self._sync_cond:
+                self._syncing = False
+                if synced is not None:
+                    self._synced = max(self._synced, synced)
+                self._sync_cond.notify_all()
+
+    def _open_segment(self):
+        self._sequence += 1
+        name = f"feedback-{os.getpid()}-{int(time.time() * 1000)}-{self._sequence}.log"
+        fh = open(os.path.join(self.directory, name), "a+", encoding="utf-8")
+        fcntl.flock(fh, fcntl.LOCK_EX)
+        return fh
+
+    def _seal(self):
+        with self._lock:
+            if self._active is not None and self._active_count:
+                if self.fsync:
+                    # Records not yet covered by a group fsync must not be
+                    # left behind when writers move to the next segment.
+                    os.fsync(self._active.fileno())
+                self._sealed.append((self._active, self._active_count))
+                self._active, self._active_count = None, 0
+
+    # --------------------------
+    # FLUSHER
+    # --------------------------
+    def _ensure_flusher(self):
+        thread = self._thread
+        if thread is None or not thread.is_alive():
+            with self._lock:
+                if self._stopping.is_set():
+                    return
+                if self._thread is thread:
+                    if thread is not None:
+                        logger.error("Feedback flusher thread died; restarting it")
+                    self._thread = threading.Thread(target=self._run, name="feedback-flusher", daemon=True)
+                    self._thread.start()
+
+    def _run(self):
+        while not self._stopping.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush()
+            except Exception:
+                # E.g. a full disk on unlink/fsync; keep the thread alive and
+                # retry on the next tick like a failed insert.
+                with self._lock:
+                    self._counters["failed_flushes"] += 1
+                logger.exception("Feedback flush failed, will retry")
+
+    def flush(self) -> int:
+        """Seal the active segment and write every sealed one; returns rows inserted."""
+        with self._flush_lock:
+            return self._flush()
+
+    def _flush(self) -> int:
+        self._seal()
+        inserted = 0
+        while True:
+            with self._lock:
+                if not self._sealed:
+                    break
+                fh, count = self._sealed[0]
+            try:
+                inserted += self._flush_segment(fh)
+            except Error as err:
+                # Keep the segment and retry on the next tick.
+                with self._lock:
+                    self._counters["failed_flushes"] += 1
+                logger.error("Feedback flush failed, will retry: %s", err)
+                break
+            with self._lock:
+                self._sealed.popleft()
+                self._pending = max(self._pending - count, 0)
+            try:
+                os.unlink(fh.name)
+            finally:
+                # A segment left on disk is replayed (harmlessly) on recovery.
+                fh.close()
+        if inserted and self.on_flush is not None:
+            self.on_flush()
+        return inserted
+
+    def _records(self, fh):
+        fh.seek(0)
+        for number, line in enumerate(fh, 1):
+            try:
+                record = json.loads(line)
+                row = (
+                    record["event_id"],
+                    record["usn"],
+                    record["rating"],
+                    record["comment"],
+                    record["key"],
+                )
+            except (ValueError, KeyError, TypeError):
+                # A torn final line from a crash mid-append was never
+                # acknowledged; any other malformed record would fail every
+                # retry and block the segment forever.
+                with self._lock:
+                    self._counters["dropped"] += 1
+                logger.warning("Skipping unreadable line %d of %s: %r", number, fh.name, line[:200])
+                continue
+            yield row
+
+    def _flush_segment(self, fh) -> int:
+        inserted = 0
+        batch = []
+        conn = self.pool.acquire()
+        try:
+            for row in self._records(fh):
+                batch.append(row)
+                if len(batch) >= self.batch_size:
+                    inserted += self._insert(conn, batch)
+                    batch = []
+            if batch:
+                inserted += self._insert(conn, batch)
+        finally:
+            conn.close()
+        return inserted
+
+    def _insert(self, conn, batch) -> int:
+        cursor = conn.cursor()
+        dropped = 0
+        try:
+            try:
+                cursor.executemany(INSERT_SQL, batch)
+                conn.commit()
+                inserted = cursor.rowcount
+            except (IntegrityError, DataError):
+                # A bad row (e.g. its event was deleted meanwhile) fails the
+                # whole statement; insert row by row and drop just that row.
+                # Any other error propagates and the segment is retried.
+                conn.rollback()
+                inserted = 0
+                for row in batch:
+                    try:
+                        cursor.execute(INSERT_SQL, row)
+                        conn.commit()
+                        inserted += cursor.rowcount
+                    except (IntegrityError, DataError) as err:
+                        conn.rollback()
+                        dropped += 1
+                        logger.warning("Dropping queued feedback %s: %s", row[4], err)
+        finally:
+            cursor.close()
+
+        # rowcount is 1 per inserted row and 0 for duplicates (no-op update).
+        with self._lock:
+            self._counters["flushed"] += inserted
+            self._counters["duplicates"] += len(batch) - dropped - inserted
+            self._counters["dropped"] += dropped
+        return inserted
+
+    # --------------------------
+    # RECOVERY / SHUTDOWN
+    # --------------------------
+    def recover(self) -> int:
+        """Claim segments left behind by dead processes; returns how many."""
+        claimed = 0
+        for path in sorted(glob.glob(os.path.join(self.directory, "feedback-*.log"))):
+            try:
+                fh = open(path, "a+", encoding="utf-8")
+            except FileNotFoundError:
+                continue
+            try:
+                fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except BlockingIOError:
+                fh.close()  # a live process owns it
+                continue
+            if not os.path.exists(path):
+                fh.close()  # flushed and removed while we were opening it
+                continue
+            fh.seek(0)
+            count = sum(1 for _ in fh)
+            with self._lock:
+                self._sealed.append((fh, count))
+                self._pending += count
+            claimed += 1
+        if claimed:
+            logger.info("Recovered %d feedback queue segment(s)", claimed)
+            self._ensure_flusher()
+            self._wake.set()
+        return claimed
+
+    def close(self, timeout: float = 10.0):
+        """Stop the flusher and make a final flush attempt."""
+        self._stopping.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        # If the flusher is still mid-flush, wait for it rather than racing it
+        # over the same segments; anything left is recovered on next start.
+        if not self._flush_lock.acquire(timeout=timeout):
+            logger.warning("Feedback flusher still busy at exit; records stay queued on disk")
+            return
+        try:
+            self._flush()
+        except Error as err:
+            logger.error("Final feedback flush failed; records stay queued on disk: %s", err)
+        finally:
+            self._flush_lock.release()
+
+    def stats(self) -> dict:
+        with self._lock:
+            stats = dict(self._counters)
+            stats.update(pending=self._pending, sealed_segments=len(self._sealed))
+        return stats
@@ -0,0 +1,291 @@
+"""Per-request DB instrumentation and a Prometheus ``/metrics`` endpoint.
+
+``init_app(app, pool)`` wraps every cursor the pool hands out so each
+``execute`` is timed and its rows counted against the current request, and
+records per-endpoint request latency plus query count, DB time and rows per
+request. Statements slower than ``SLOW_QUERY_MS`` are logged to the
+``portal.slow_query`` logger. Everything is exposed in the Prometheus text
+format at ``/metrics``, together with the pool's own stats.
+
+``/metrics`` is closed unless configured: ``METRICS_TOKEN`` admits scrapers
+sending ``Authorization: Bearer <token>``, ``METRICS_ALLOW_IPS`` (comma-
+separated addresses or CIDR ranges) admits clients by ``remote_addr``, and
+``METRICS_PUBLIC=1`` opts out and serves it to anyone. With none of these
+set the endpoint answers 404. ``scraper_allowed()`` applies the same rules
+to other routes that expose internal state, such as ``/health/db``.
+
+Metrics live in process memory: with several worker processes, scrape each
+one (or sum in Prometheus).
+"""
+from contextvars import ContextVar
+import hmac
+import ipaddress
+import logging
+import os
+import threading
+import time
+
+from flask import Response, abort, current_app, g, has_request_context, request
+
+SLOW_QUERY_MS = float(os.getenv("SLOW_QUERY_MS", "200"))
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55)
+
+logger = logging.getLogger(__name__)
+slow_query_log = logging.getLogger("portal.slow_query")
+
+# Stats of the request being served; fan-out threads inherit it through a
+# copied context.
+_current = ContextVar("portal_request_stats", default=None)
+
+
+class RequestStats:
+    __slots__ = ("queries", "db_time", "rows", "_lock")
+
+    def __init__(self):
+        self.queries = 0
+        self.db_time = 0.0
+        self.rows = 0
+        self._lock = threading.Lock()
+
+    def add(self, queries: int = 0, db_time: float = 0.0, rows: int = 0):
+        with self._lock:
+            self.queries += queries
+            self.db_time += db_time
+            self.rows += rows
+
+
+class InstrumentedCursor:
+    """Cursor proxy timing statements and counting the rows they return."""
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+
+    def _timed(self, method, operation, *args, **kwargs):
+        stats = _current.get()
+        began = time.perf_counter()
+        try:
+            return method(operation, *args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - began
+            if stats is not None:
+                stats.add(queries=1, db_time=elapsed)
+            if elapsed * 1000 >= SLOW_QUERY_MS:
+                slow_query_log.warning(
+                    "%.1f ms %s: %s",
+                    elapsed * 1000,
+                    request.endpoint if has_request_context() else "-",
+                    " ".join(str(operation).split())[:500],
+                )
+
+    def execute(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.execute, operation, *args, **kwargs)
+
+    def executemany(self, operation, *args, **kwargs):
+        return self._timed(self._cursor.executemany, operation, *args, **kwargs)
+
+    def _count(self, rows):
+        stats = _current.get()
+        if stats is not None and rows:
+            stats.add(rows=len(rows))
+        return rows
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        if row is not None:
+            self._count((row,))
+        return row
+
+    def fetchmany(self, *args, **kwargs):
+        return self._count(self._cursor.fetchmany(*args, **kwargs))
+
+    def fetchall(self):
+        return self._count(self._cursor.fetchall())
+
+    def __iter__(self):
+        return iter(self._cursor)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in zip(names, values))
+
+
+class _Histogram:
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.series = {}
+
+    def observe(self, key, value):
+        series = self.series.get(key)
+        if series is None:
+            series = self.series[key] = [[0] * len(self.buckets), 0.0, 0]
+        counts = series[0]
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                counts[i] += 1
+                break
+        series[1] += value
+        series[2] += 1
+
+    def render(self, name, label_names):
+        for key, (counts, total, count) in sorted(self.series.items()):
+            labels = _labels(label_names, key)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets, counts):
+                cumulative += bucket_count
+                yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+            yield f'{name}_bucket{{{labels},le="+Inf"}} {count}'
+            yield f"{name}_sum{{{labels}}} {total}"
+            yield f"{name}_count{{{labels}}} {count}"
+
+
+class MetricsRegistry:
+    """Process-wide counters and histograms, keyed by endpoint."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.db_queries = {}
+        self.db_time = {}
+        self.db_rows = {}
+        self.latency = _Histogram(LATENCY_BUCKETS)
+        self.queries_per_request = _Histogram(QUERY_COUNT_BUCKETS)
+        self.sources = {}
+
+    def add_source(self, name: str, stats):
+        """Render the numbers in ``stats()`` as ``portal_<name>_*`` gauges."""
+        self.sources[name] = stats
+
+    def observe_request(self, endpoint, method, status, duration, stats):
+        with self._lock:
+            key = (endpoint, method, str(status))
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.observe((endpoint,), duration)
+            self.queries_per_request.observe((endpoint,), stats.queries)
+            self.db_queries[endpoint] = self.db_queries.get(endpoint, 0) + stats.queries
+            self.db_time[endpoint] = self.db_time.get(endpoint, 0.0) + stats.db_time
+            self.db_rows[endpoint] = self.db_rows.get(endpoint, 0) + stats.rows
+
+    def render(self, pool_stats=None) -> str:
+        lines = []
+
+        def family(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        with self._lock:
+            family("portal_http_requests_total", "counter", "HTTP requests served.")
+            for key, value in sorted(self.requests.items()):
+                labels = _labels(("endpoint", "method", "status"), key)
+                lines.append(f"portal_http_requests_total{{{labels}}} {value}")
+
+            family("portal_http_request_duration_seconds", "histogram", "Request latency.")
+            lines.extend(self.latency.render("portal_http_request_duration_seconds", ("endpoint",)))
+
+            family("portal_db_queries_per_request", "histogram", "DB statements issued per request.")
+            lines.extend(self.queries_per_request.render("portal_db_queries_per_request", ("endpoint",)))
+
+            for name, values, help_text in (
+                ("portal_db_queries_total", self.db_queries, "DB statements executed."),
+                ("portal_db_query_seconds_total", self.db_time, "Time spent executing DB statements."),
+                ("portal_db_rows_total", self.db_rows, "Rows fetched from the DB."),
+            ):
+                family(name, "counter", help_text)
+                for endpoint, value in sorted(values.items()):
+                    lines.append(f'{name}{{endpoint="{_escape(endpoint)}"}} {value}')
+
+        sources = [("db_pool", "Connection pool", pool_stats or {})]
+        sources += [(name, name.replace("_", " ").capitalize(), stats()) for name, stats in self.sources.items()]
+        for name, title, values in sources:
+            for key, value in sorted(values.items()):
+                if isinstance(value, (int, float)) and not isinstance(value, bool):
+                    family(f"portal_{name}_{key}", "gauge", f"{title} {key.replace('_', ' ')}.")
+                    lines.append(f"portal_{name}_{key} {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def _allowed_networks(value: str) -> list:
+    return [ipaddress.ip_network(part.strip(), strict=False) for part in value.split(",") if part.strip()]
+
+
+def _metrics_access():
+    """Return ``denied()``: ``None`` if the request may scrape, else an HTTP status."""
+    token = os.getenv("METRICS_TOKEN")
+    networks = _allowed_networks(os.getenv("METRICS_ALLOW_IPS", ""))
+    public = os.getenv("METRICS_PUBLIC", "0").lower() in ("1", "true", "yes")
+    if not (token or networks or public):
+        logger.warning("/metrics is disabled; set METRICS_TOKEN, METRICS_ALLOW_IPS or METRICS_PUBLIC=1")
+
+    def denied():
+        if public:
+            return None
+        if token:
+            supplied = request.headers.get("Authorization", "")
+            if hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+                return None
+        if networks:
+            try:
+                address = ipaddress.ip_address(request.remote_addr or "")
+            except ValueError:
+                address = None
+            if address is not None and any(address in network for network in networks):
+                return None
+        if token:
+            return 401
+        return 403 if networks else 404
+
+    return denied
+
+
+def scraper_allowed() -> bool:
+    """Whether the current request passes the ``/metrics`` access rules."""
+    registry = current_app.extensions.get("metrics")
+    return registry is not None and registry.access_denied() is None
+
+
+def init_app(app, pool, registry: MetricsRegistry = None):
+    """Instrument ``pool`` and register request hooks and ``/metrics``."""
+    registry = registry or MetricsRegistry()
+    app.extensions["metrics"] = registry
+    pool.cursor_wrapper = InstrumentedCursor
+    registry.access_denied = _metrics_access()
+
+    @app.before_request
+    def start_request_metrics():
+        g._metrics_started = time.perf_counter()
+        g._metrics_token = _current.set(RequestStats())
+
+    @app.after_request
+    def record_request_metrics(response):
+        started = g.pop("_metrics_started", None)
+        reset_token = g.pop("_metrics_token", None)
+        if started is not None:
+            stats = _current.get()
+            _current.reset(reset_token)
+            registry.observe_request(
+                request.endpoint or "unmatched",
+                request.method,
+                response.status_code,
+                time.perf_counter() - started,
+                stats,
+            )
+        return response
+
+    @app.route("/metrics")
+    def metrics():
+        status = registry.access_denied()
+        if status is not None:
+            abort(status)
+        body = registry.render(pool.stats())
+        return Response(body, mimetype="text/plain; version=0.0.4")
+
+    return registry
@@ -0,0 +1,200 @@
+"""Versioned schema migrations.
+
+Migrations are ``migrations/NNNN_description.sql`` files at the repository
+root, each with a ``-- migrate:up`` and a ``-- migrate:down`` section of
+``;``-terminated statements. As in the ``mysql`` client, a ``DELIMITER //``
+line switches the terminator so trigger and procedure bodies can contain
+``;``, and ``DELIMITER ;`` switches back. Applied versions are recorded in
+``schema_migrations``; ``migrate`` applies pending ones in version order and
+``rollback`` undoes the most recent. Both apps expose them as
+``flask db-migrate`` / ``db-rollback`` / ``db-status``.
+
+MySQL commits DDL implicitly, so a migration that fails partway is not
+undone: fix the cause, revert the statements that did run by hand, and
+migrate again.
+"""
+import os
+import re
+
+import click
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "migrations")
+
+_FILENAME_RE = re.compile(r"^(\d+)_(\w+)\.sql$")
+_SECTION_RE = re.compile(r"^--\s*migrate:(up|down)\s*$", re.MULTILINE)
+_DELIMITER_RE = re.compile(r"^\s*DELIMITER\s+(\S+)\s*$", re.IGNORECASE)
+
+CREATE_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS schema_migrations (
+        version INT PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        applied_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+    )
+"""
+
+
+class MigrationError(Exception):
+    """A migration file is malformed or the requested step is impossible."""
+
+
+def _is_code(line: str) -> bool:
+    line = line.strip()
+    return bool(line) and not line.startswith("--")
+
+
+def _statements(sql: str) -> list:
+    statements, lines, delimiter = [], [], ";"
+
+    def finish():
+        if any(_is_code(line) for line in lines):
+            statements.append("\n".join(lines).strip())
+        lines.clear()
+
+    for line in sql.splitlines():
+        match = _DELIMITER_RE.match(line)
+        if match:
+            finish()
+            delimiter = match.group(1)
+            continue
+        stripped = line.rstrip()
+        if stripped.endswith(delimiter):
+            lines.append(stripped[: -len(delimiter)])
+            finish()
+        else:
+            lines.append(line)
+    finish()
+    return statements
+
+
+def load_migrations(directory: str = MIGRATIONS_DIR) -> list:
+    """Return migrations as dicts (``version``, ``name``, ``up``, ``down``), oldest first."""
+    migrations = []
+    for filename in sorted(os.listdir(directory)):
+        match = _FILENAME_RE.match(filename)
+        if not match:
+            continue
+        with open(os.path.join(directory, filename)) as fh:
+            parts = _SECTION_RE.split(fh.read())
+        # parts: [preamble, "up"|"down", body, "up"|"down", body]
+        sections = dict(zip(parts[1::2], parts[2::2]))
+        if "up" not in sections:
+            raise MigrationError(f"{filename} has no '-- migrate:up' section")
+        migrations.append(
+            {
+                "version": int(match.group(1)),
+                "name": match.group(2),
+                "up": _statements(sections["up"]),
+                "down": _statements(sections.get("down", "")),
+            }
+        )
+
+    versions = [migration["version"] for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise MigrationError("Duplicate migration version numbers")
+    return migrations
+
+
+def applied_versions(conn) -> dict:
+    """Map applied version -> applied_at, creating the table if needed."""
+    cursor = conn.cursor()
+    try:
+        cursor.execute(CREATE_TABLE_SQL)
+        cursor.execute("SELECT version, applied_at FROM schema_migrations")
+        return dict(cursor.fetchall())
+    finally:
+        cursor.close()
+
+
+def _run(conn, migration: dict, direction: str):
+    cursor = conn.cursor()
+    try:
+        for statement in migration[direction]:
+            cursor.execute(statement)
+        if direction == "up":
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (migration["version"], migration["name"]),
+            )
+        else:
+            cursor.execute("DELETE FROM schema_migrations WHERE version = %s", (migration["version"],))
+        conn.commit()
+    except Exception:
+        conn.rollback()
+        raise
+    finally:
+        cursor.close()
+
+
+def migrate(conn, target: int = None, directory: str = MIGRATIONS_DIR) -> list:
+    """Apply pending migrations up to ``target`` (default: all); returns them."""
+    applied = applied_versions(conn)
+    pending = [
+        migration
+        for migration in load_migrations(directory)
+        if migration["version"] not in applied and (target is None or migration["version"] <= target)
+    ]
+    for migration in pending:
+        _run(conn, migration, "up")
+    return pending
+
+
+def rollback(conn, steps: int = 1, directory: str = MIGRATIONS_DIR) -> list:
+    """Undo the ``steps`` most recently applied migrations; returns them."""
+    applied = applied_versions(conn)
+    done = [migration for migration in load_migrations(directory) if migration["version"] in applied]
+    undone = list(reversed(done))[:steps]
+    for migration in undone:
+        if not migration["down"]:
+            raise MigrationError(f"Migration {migration['version']} cannot be rolled back")
+        _run(conn, migration, "down")
+    return undone
+
+
+def status(conn, directory: str = MIGRATIONS_DIR) -> list:
+    """``(migration, applied_at or None)`` for every known migration."""
+    applied = applied_versions(conn)
+    return [
+        (migration, applied.get(migration["version"]))
+        for migration in load_migrations(directory)
+    ]
+
+
+def init_app(app, pool):
+    """Register the ``db-migrate``, ``db-rollback`` and ``db-status`` commands."""
+
+    @app.cli.command("db-migrate")
+    @click.option("--target", type=int, help="Stop after this version.")
+    def migrate_command(target):
+        """Apply pending schema migrations."""
+        conn = pool.acquire()
+        try:
+            applied = migrate(conn, target)
+        finally:
+            conn.close()
+        for migration in applied:
+            print(f"Applied {migration['version']:04d} {migration['name']}")
+        print(f"{len(applied)} migration(s) applied.")
+
+    @app.cli.command("db-rollback")
+    @click.option("--steps", type=int, default=1, show_default=True)
+    def rollback_command(steps):
+        """Undo the most recently applied migrations."""
+        conn = pool.acquire()
+        try:
+            undone = rollback(conn, steps)
+        finally:
+            conn.close()
+        for migration in undone:
+            print(f"Rolled back {migration['version']:04d} {migration['name']}")
+
+    @app.cli.command("db-status")
+    def status_command():
+        """List migrations and whether they are applied."""
+        conn = pool.acquire()
+        try:
+            rows = status(conn)
+        finally:
+            conn.close()
+        for migration, applied_at in rows:
+            state = f"applied {applied_at}" if applied_at else "pending"
+            print(f"{migration['version']:04d} {migration['name']:40} {state}")
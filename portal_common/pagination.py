@@ -0,0 +1,154 @@
+"""Keyset (cursor) pagination for list views.
+
+Pages are addressed by the sort key of a boundary row rather than an
+OFFSET, so fetching page N costs the same index range scan as page 1.
+Cursors are opaque URL-safe tokens carrying that key.
+"""
+import base64
+from datetime import datetime
+from decimal import Decimal
+import json
+import os
+
+DEFAULT_PAGE_SIZE = int(os.getenv("ADMIN_PAGE_SIZE", "50"))
+MAX_PAGE_SIZE = 500
+
+
+class InvalidCursor(ValueError):
+    """A pagination cursor could not be decoded."""
+
+
+def page_size_from(value, default: int = DEFAULT_PAGE_SIZE) -> int:
+    """Parse a ``per_page`` argument, clamped to ``1..MAX_PAGE_SIZE``."""
+    try:
+        size = int(value)
+    except (TypeError, ValueError):
+        return default
+    return max(1, min(size, MAX_PAGE_SIZE))
+
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {"dt": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"dec": str(value)}
+    return value
+
+
+def _decode_value(value):
+    if isinstance(value, dict):
+        if value.keys() == {"dt"} and isinstance(value["dt"], str):
+            return datetime.fromisoformat(value["dt"])
+        if value.keys() == {"dec"} and isinstance(value["dec"], str):
+            return Decimal(value["dec"])
+        raise ValueError("unknown tagged value in cursor")
+    if value is None or isinstance(value, (str, int, float)):
+        return value
+    raise TypeError("cursor values must be scalars")
+
+
+def _reject_constant(name):
+    raise ValueError(f"{name} is not allowed in a cursor")
+
+
+def encode_cursor(values) -> str:
+    payload = [_encode_value(v) for v in values]
+    raw = json.dumps(payload, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(token: str, width: int = None) -> list:
+    """Decode a cursor; ``width`` is the number of sort columns it must match."""
+    try:
+        raw = base64.urlsafe_b64decode(token + "=" * (-len(token) % 4))
+        payload = json.loads(raw, parse_constant=_reject_constant)
+        if not isinstance(payload, list):
+            raise TypeError("cursor payload is not a list")
+        if width is not None and len(payload) != width:
+            raise ValueError("cursor does not match the sort columns")
+        return [_decode_value(v) for v in payload]
+    except (ValueError, TypeError, ArithmeticError) as err:
+        raise InvalidCursor(f"Invalid page cursor: {token!r}") from err
+
+
+def _after_clause(columns, descending: bool) -> str:
+    """SQL matching rows strictly after the cursor in the listing order.
+
+    Expanded as ``a > %s OR (a = %s AND b > %s)`` rather than a row
+    constructor so MySQL can use a range scan on the ``(a, b)`` index.
+    """
+    op = "<" if descending else ">"
+    terms = []
+    for i, column in enumerate(columns):
+        equal = [f"{prev} = %s" for prev in columns[:i]]
+        terms.append("(" + " AND ".join(equal + [f"{column} {op} %s"]) + ")")
+    return " OR ".join(terms)
+
+
+def _after_params(values) -> list:
+    params = []
+    for i in range(len(values)):
+        params.extend(values[: i + 1])
+    return params
+
+
+def fetch_page(
+    cursor,
+    select_sql: str,
+    order: list,
+    clauses=(),
+    params=(),
+    descending: bool = False,
+    page_size: int = DEFAULT_PAGE_SIZE,
+    after: str = None,
+    before: str = None,
+):
+    """Fetch one keyset page and return ``(rows, page)``.
+
+    ``order`` lists ``(sql_expression, row_key)`` pairs; the last pair must
+    be unique (the primary key) so the order is total. ``clauses`` and
+    ``params`` are the view's own filters, ANDed with the keyset condition.
+    ``after``/``before`` are cursors from a previous ``page``, which holds
+    ``next``/``prev`` cursors (``None`` at either end) and ``size``.
+    """
+    columns = [column for column, _ in order]
+    keys = [key for _, key in order]
+    clauses = list(clauses)
+    params = list(params)
+
+    backwards = bool(before) and not after
+    token = after or before
+    if token:
+        values = decode_cursor(token, width=len(columns))
+        # Walking backwards is the same query in the opposite order.
+        clauses.append(_after_clause(columns, descending != backwards))
+        params.extend(_after_params(values))
+
+    direction = "ASC" if descending == backwards else "DESC"
+    sql = select_sql
+    if clauses:
+        sql += " WHERE " + " AND ".join(f"({clause})" for clause in clauses)
+    sql += " ORDER BY " + ", ".join(f"{column} {direction}" for column in columns)
+    sql += " LIMIT %s"
+    params.append(page_size + 1)
+
+    cursor.execute(sql, params)
+    rows = cursor.fetchall()
+    has_more = len(rows) > page_size
+    rows = rows[:page_size]
+    if backwards:
+        rows.reverse()
+
+    def key_of(row):
+        return [row[key] for key in keys]
+
+    if backwards:
+        has_next, has_prev = True, has_more
+    else:
+        has_next, has_prev = has_more, bool(token)
+    page = {
+        "size": page_size,
+        "next": encode_cursor(key_of(rows[-1])) if rows and has_next else None,
+        "prev": encode_cursor(key_of(rows[0])) if rows and has_prev else None,
+    }
+    return rows, page
@@ -0,0 +1,164 @@
+"""On-demand per-request profiling with flame-graph output.
+
+Disabled unless ``PROFILE_DIR`` is set; ``init_app`` then registers nothing
+and requests pay nothing. When enabled, a request is profiled if
+
+* it carries ``X-Profile: <PROFILE_TOKEN>`` or ``?_profile=<PROFILE_TOKEN>``,
+* the app passes ``is_admin`` and a logged-in admin adds ``?_profile=1``, or
+* it is picked by sampling, one in every ``PROFILE_SAMPLE_EVERY`` requests.
+
+A profiled request is sampled by a background thread every
+``PROFILE_INTERVAL_MS`` (default 1 ms), so the overhead stays flat however
+deep the code goes. Two files are written to ``PROFILE_DIR``: ``*.folded``
+holds collapsed stacks (``frame;frame;frame count``) for flamegraph.pl,
+speedscope or inferno, and ``*.json`` holds the per-phase breakdown. Each
+sample is attributed to one phase: ``db`` (inside mysql-connector),
+``template`` (inside Jinja), ``waiting`` (blocked on a lock, such as pool
+checkout or fan-out results) or ``python``. The breakdown is also returned
+in a ``Server-Timing`` header, so browser dev tools show it. Only the view
+is covered; a streamed body is produced after the profile is closed.
+"""
+from collections import Counter
+from datetime import datetime
+import hmac
+import itertools
+import json
+import os
+import re
+import sys
+import threading
+import time
+
+from flask import g, request
+
+PHASES = ("db", "template", "waiting", "python")
+
+_UNSAFE_RE = re.compile(r"[^\w.-]+")
+
+
+def _phase(frame) -> str:
+    innermost = frame
+    while frame is not None:
+        filename = frame.f_code.co_filename
+        if "mysql" in filename and "connector" in filename:
+            return "db"
+        if "jinja2" in filename or filename.endswith(".html"):
+            return "template"
+        frame = frame.f_back
+    if innermost.f_code.co_filename.endswith("threading.py"):
+        return "waiting"
+    return "python"
+
+
+def _label(code) -> str:
+    filename = code.co_filename
+    short = os.path.join(os.path.basename(os.path.dirname(filename)), os.path.basename(filename))
+    return f"{code.co_name} ({short}:{code.co_firstlineno})".replace(";", ":")
+
+
+def _stack(frame) -> str:
+    labels = []
+    while frame is not None:
+        labels.append(_label(frame.f_code))
+        frame = frame.f_back
+    return ";".join(reversed(labels))
+
+
+class StackSampler(threading.Thread):
+    """Sample one thread's Python stack at a fixed interval."""
+
+    def __init__(self, thread_id: int, interval: float):
+        super().__init__(name="request-profiler", daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.phases = Counter()
+        self._stopped = threading.Event()
+
+    def run(self):
+        while not self._stopped.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            if frame is None:
+                continue
+            self.stacks[_stack(frame)] += 1
+            self.phases[_phase(frame)] += 1
+
+    def stop(self):
+        self._stopped.set()
+        self.join()
+
+
+def init_app(app, is_admin=None):
+    """Enable request profiling when ``PROFILE_DIR`` is configured."""
+    directory = os.getenv("PROFILE_DIR")
+    if not directory:
+        return
+    token = os.getenv("PROFILE_TOKEN")
+    sample_every = int(os.getenv("PROFILE_SAMPLE_EVERY", "0"))
+    interval = float(os.getenv("PROFILE_INTERVAL_MS", "1")) / 1000
+    sequence = itertools.count(1)
+    os.makedirs(directory, exist_ok=True)
+
+    def wanted() -> bool:
+        flag = request.headers.get("X-Profile") or request.args.get("_profile")
+        if flag and token and hmac.compare_digest(flag.encode(), token.encode()):
+            return True
+        if flag and is_admin is not None and is_admin():
+            return True
+        return bool(sample_every) and next(sequence) % sample_every == 0
+
+    @app.before_request
+    def start_profile():
+        if wanted():
+            sampler = StackSampler(threading.get_ident(), interval)
+            g._profile = (sampler, time.perf_counter())
+            sampler.start()
+
+    @app.after_request
+    def finish_profile(response):
+        profile = g.pop("_profile", None)
+        if profile is None:
+            return response
+        sampler, started = profile
+        sampler.stop()
+        wall_ms = (time.perf_counter() - started) * 1000
+
+        samples = sum(sampler.phases.values())
+        phases_ms = {
+            phase: round(wall_ms * sampler.phases[phase] / samples, 2) if samples else 0.0
+            for phase in PHASES
+        }
+        endpoint = request.endpoint or "unmatched"
+        basename = "{}-{}-{}".format(
+            datetime.now().strftime("%Y%m%dT%H%M%S.%f"), _UNSAFE_RE.sub("_", endpoint), os.getpid()
+        )
+        path = os.path.join(directory, basename)
+        with open(path + ".folded", "w") as fh:
+            for stack, count in sampler.stacks.most_common():
+                fh.write(f"{stack} {count}\n")
+        with open(path + ".json", "w") as fh:
+            json.dump(
+                {
+                    "endpoint": endpoint,
+                    "method": request.method,
+                    "path": request.full_path,
+                    "status": response.status_code,
+                    "wall_ms": round(wall_ms, 2),
+                    "interval_ms": interval * 1000,
+                    "samples": samples,
+                    "phases_ms": phases_ms,
+                    "phases_pct": {
+                        phase: round(100 * sampler.phases[phase] / samples, 1) if samples else 0.0
+                        for phase in PHASES
+                    },
+                    "folded": basename + ".folded",
+                },
+                fh,
+                indent=2,
+            )
+
+        response.headers["Server-Timing"] = ", ".join(
+            [f"{phase};dur={ms}" for phase, ms in phases_ms.items()] + [f"total;dur={wall_ms:.2f}"]
+        )
+        response.headers["X-Profile-File"] = basename
+        return response
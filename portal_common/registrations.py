@@ -0,0 +1,47 @@
+"""Race-free, single round-trip seat reservation against ``event.max_seats``."""
+from contextlib import closing
+
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
+
+RESERVED = "reserved"
+STUDENT_NOT_FOUND = "student_not_found"
+EVENT_NOT_FOUND = "event_not_found"
+EVENT_FULL = "event_full"
+ALREADY_REGISTERED = "already_registered"
+
+
+def register_student(conn, event_id: int, usn: int) -> tuple:
+    """Register ``usn`` for ``event_id`` through the ``register_student`` procedure.
+
+    The procedure (see migrations/0001_registration_procedure.sql) validates
+    the student, locks the event row with ``SELECT ... FOR UPDATE``, checks
+    duplicates and capacity, inserts with a server-generated ``reg_id`` and
+    commits, all in one ``CALL``.
+    Concurrent reservations for the same event queue on that row, so
+    ``max_seats`` can never be exceeded. Reservations for different events
+    never block each other.
+
+    Returns ``(outcome, reg_id)``; ``reg_id`` is ``None`` unless the outcome
+    is ``RESERVED``. Constraint violations raised by the insert are mapped
+    to the matching outcome.
+    """
+    try:
+        with closing(conn.cursor()) as cursor:
+            row = None
+            for result in cursor.execute(
+                "CALL register_student(%s, %s)", (event_id, usn), multi=True
+            ):
+                if result.with_rows:
+                    row = result.fetchone()
+                    result.fetchall()
+    except IntegrityError as err:
+        conn.rollback()
+        if err.errno == errorcode.ER_DUP_ENTRY:
+            return ALREADY_REGISTERED, None
+        if err.errno == errorcode.ER_NO_REFERENCED_ROW_2:
+            return STUDENT_NOT_FOUND, None
+        raise
+
+    outcome, reg_id = row
+    return outcome, reg_id
@@ -0,0 +1,27 @@
+"""Maintenance for the trigger-maintained ``event_feedback_rollup`` table."""
+from contextlib import closing
+
+REBUILD_SQL = """
+    INSERT INTO event_feedback_rollup
+        (event_id, feedback_count, rating_sum, rating_1, rating_2, rating_3, rating_4, rating_5)
+    SELECT event_id, COUNT(*), SUM(rating), SUM(rating = 1), SUM(rating = 2), SUM(rating = 3),
+           SUM(rating = 4), SUM(rating = 5)
+    FROM feedback
+    WHERE event_id IS NOT NULL AND rating IS NOT NULL
+    GROUP BY event_id
+"""
+
+
+def rebuild_feedback_rollups(conn) -> int:
+    """Recompute every event's rollup from ``feedback`` in one transaction.
+
+    Used to backfill the table after it is created and to repair drift
+    (MySQL does not fire the rollup triggers for cascaded deletes).
+    Returns the number of events with feedback.
+    """
+    with closing(conn.cursor()) as cursor:
+        cursor.execute("DELETE FROM event_feedback_rollup")
+        cursor.execute(REBUILD_SQL)
+        rebuilt = cursor.rowcount
+    conn.commit()
+    return rebuilt
@@ -0,0 +1,243 @@
+"""Read/write splitting across a primary and read replicas.
+
+``ConnectionRouter`` stands in for a ``ConnectionPool``. It keeps one pool
+for the primary and one per replica. Inside a request it routes by HTTP
+method: ``GET``/``HEAD`` requests read from a replica, and anything else
+(the POSTs that register, submit feedback, import or delete) uses the
+primary. Outside a request, e.g. in CLI commands and migrations, everything
+goes to the primary.
+
+Two safeguards keep reads fresh:
+
+* Read-your-writes: a write request stamps the user's session, and for
+  ``read_your_writes`` seconds afterwards that user's reads also go to the
+  primary, so the page after "Registration Successful!" shows the new seat
+  count.
+* Lag fallback: each replica's ``Seconds_Behind_Source`` is checked at most
+  every ``lag_check_interval`` seconds. Replicas that lag more than
+  ``max_lag`` seconds, have replication stopped or cannot be reached are
+  skipped. With none left, reads fall back to the primary.
+
+Other users' reads keep going to replicas straight after a write, but a
+page or cache entry built from them must not carry the new data version
+(ETag, ``SnapshotCache``) before the replica has applied that write. When
+``last_write`` is set (a callable returning the Unix time of the latest
+write anywhere, e.g. the shared data version), a replica read is flagged
+as unsettled unless the replica's last lag check shows it had already
+replayed past that time; ``read_unsettled()`` reports the flag for the
+current request.
+
+Replicas come from ``DB_REPLICAS`` (comma-separated ``host[:port]``). They
+share the primary's credentials and database name. Without replicas every
+call goes straight to the primary pool.
+"""
+import itertools
+import os
+import threading
+import time
+
+from flask import g, has_app_context, has_request_context, request, session
+from mysql.connector import Error
+
+from .db_pool import ConnectionPool
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+_WRITE_STAMP = "_db_wrote_at"
+_UNSETTLED = "_db_unsettled_read"
+
+
+def read_unsettled() -> bool:
+    """Whether this request read from a replica that may lack the latest write."""
+    return has_app_context() and g.get(_UNSETTLED, False)
+
+
+def _replica_configs(config: dict, spec: str) -> list:
+    configs = []
+    for entry in filter(None, (part.strip() for part in spec.split(","))):
+        host, _, port = entry.partition(":")
+        replica = dict(config, host=host)
+        if port:
+            replica["port"] = int(port)
+        configs.append(replica)
+    return configs
+
+
+class _Replica:
+    def __init__(self, pool: ConnectionPool):
+        self.pool = pool
+        self.lag = None
+        self.checked_at = float("-inf")
+        self.applied_through = float("-inf")  # Unix time the replica has replayed up to
+        self.lock = threading.Lock()
+
+
+class ConnectionRouter:
+    """Route connections to the primary or a replica; see the module docstring."""
+
+    def __init__(
+        self,
+        primary: ConnectionPool,
+        replicas=(),
+        max_lag: float = 5.0,
+        lag_check_interval: float = 1.0,
+        read_your_writes: float = 10.0,
+        last_write=None,
+    ):
+        self.primary = primary
+        self.replicas = [_Replica(pool) for pool in replicas]
+        self.max_lag = max_lag
+        self.lag_check_interval = lag_check_interval
+        self.read_your_writes = read_your_writes
+        self.last_write = last_write
+        self._next = itertools.count()
+        self._lock = threading.Lock()
+        self._counters = {
+            "primary_checkouts": 0,
+            "primary_reads": 0,
+            "replica_reads": 0,
+            "lag_fallbacks": 0,
+            "unsettled_reads": 0,
+        }
+
+    @classmethod
+    def from_env(cls, config: dict, prefix: str = "DB_"):
+        replicas = [
+            ConnectionPool.from_env(replica)
+            for replica in _replica_configs(config, os.getenv(prefix + "REPLICAS", ""))
+        ]
+        return cls(
+            ConnectionPool.from_env(config),
+            replicas,
+            max_lag=float(os.getenv(prefix + "REPLICA_MAX_LAG", "5")),
+            lag_check_interval=float(os.getenv(prefix + "REPLICA_LAG_CHECK_INTERVAL", "1")),
+            read_your_writes=float(os.getenv(prefix + "READ_YOUR_WRITES_SECONDS", "10")),
+        )
+
+    @property
+    def pools(self) -> list:
+        return [self.primary] + [replica.pool for replica in self.replicas]
+
+    # Pool-compatible surface used by db_session, fanout, metrics and the CLI.
+    @property
+    def cursor_wrapper(self):
+        return self.primary.cursor_wrapper
+
+    @cursor_wrapper.setter
+    def cursor_wrapper(self, wrapper):
+        for pool in self.pools:
+            pool.cursor_wrapper = wrapper
+
+    def acquire(self, timeout: float = None, readonly: bool = None):
+        """Borrow a connection; ``readonly=None`` decides from the request."""
+        in_request = has_request_context()
+        if readonly is None:
+            readonly = in_request and request.method in SAFE_METHODS
+
+        if not readonly:
+            if in_request and request.method not in SAFE_METHODS:
+                session[_WRITE_STAMP] = time.time()
+            self._count("primary_checkouts")
+            return self.primary.acquire(timeout)
+
+        if self.replicas and not (in_request and self._recently_wrote()):
+            for replica in self._fresh_replicas():
+                try:
+                    conn = replica.pool.acquire(timeout)
+                except Error:
+                    replica.lag = None
+                    continue
+                self._count("replica_reads")
+                if self._unsettled(replica):
+                    self._count("unsettled_reads")
+                    if has_app_context():
+                        setattr(g, _UNSETTLED, True)
+                return conn
+            self._count("lag_fallbacks")
+
+        self._count("primary_reads")
+        return self.primary.acquire(timeout)
+
+    def _count(self, name: str):
+        with self._lock:
+            self._counters[name] += 1
+
+    def _unsettled(self, replica: _Replica) -> bool:
+        return self.last_write is not None and self.last_write() > replica.applied_through
+
+    def _recently_wrote(self) -> bool:
+        wrote_at = session.get(_WRITE_STAMP)
+        return wrote_at is not None and time.time() - wrote_at < self.read_your_writes
+
+    def _fresh_replicas(self) -> list:
+        start = next(self._next)
+        ordered = self.replicas[start % len(self.replicas):] + self.replicas[: start % len(self.replicas)]
+        fresh = []
+        for replica in ordered:
+            self._refresh_lag(replica)
+            if replica.lag is not None and replica.lag <= self.max_lag:
+                fresh.append(replica)
+        return fresh
+
+    def _refresh_lag(self, replica: _Replica):
+        if time.monotonic() - replica.checked_at < self.lag_check_interval:
+            return
+        # One thread checks; the rest keep using the last known lag.
+        if not replica.lock.acquire(blocking=False):
+            return
+        try:
+            checked_at = time.time()
+            replica.lag = self._measure_lag(replica.pool)
+            replica.checked_at = time.monotonic()
+            # Seconds_Behind_Source is whole seconds, hence the extra second.
+            replica.applied_through = (
+                checked_at - replica.lag - 1 if replica.lag is not None else float("-inf")
+            )
+        finally:
+            replica.lock.release()
+
+    @staticmethod
+    def _measure_lag(pool: ConnectionPool):
+        """Replication delay in seconds, or ``None`` if unknown/stopped."""
+        try:
+            conn = pool.acquire(timeout=1.0)
+        except Error:
+            return None
+        try:
+            cursor = conn.cursor(dictionary=True)
+            try:
+                try:
+                    cursor.execute("SHOW REPLICA STATUS")
+                except Error:
+                    # MySQL < 8.0.22 / MariaDB.
+                    cursor.execute("SHOW SLAVE STATUS")
+                row = cursor.fetchone()
+            finally:
+                cursor.close()
+        except Error:
+            return None
+        finally:
+            conn.close()
+        if not row:
+            return None
+        lag = row.get("Seconds_Behind_Source", row.get("Seconds_Behind_Master"))
+        return float(lag) if lag is not None else None
+
+    def stats(self) -> dict:
+        """Primary pool stats plus routing counters and per-replica detail."""
+        stats = dict(self.primary.stats())
+        with self._lock:
+            stats.update(self._counters)
+        stats["replicas"] = [
+            {
+                "host": replica.pool.config.get("host"),
+                "port": replica.pool.config.get("port", 3306),
+                "lag": replica.lag,
+                "pool": replica.pool.stats(),
+            }
+            for replica in self.replicas
+        ]
+        return stats
+
+    def dispose(self):
+        for pool in self.pools:
+            pool.dispose()
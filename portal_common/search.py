@@ -0,0 +1,32 @@
+"""Helpers for the admin search boxes backed by MySQL FULLTEXT indexes."""
+import re
+
+# InnoDB's default innodb_ft_min_token_size; shorter words are not indexed.
+MIN_TOKEN_SIZE = 3
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def is_exact_id(query: str) -> bool:
+    """Numeric queries are USNs / IDs and take the exact-match path."""
+    return re.fullmatch(r"[0-9]+", query) is not None
+
+
+def boolean_match_terms(query: str):
+    """Turn free text into a ``MATCH ... AGAINST`` boolean-mode string.
+
+    Every indexable word becomes a required prefix term (``+word*``), so
+    "data sci" finds "Data Science Seminar". Boolean operators typed by the
+    user are dropped. Returns ``None`` when no word is long enough to be in
+    the index; callers then fall back to an anchored ``LIKE 'q%'``.
+    """
+    words = [word for word in _WORD_RE.findall(query) if len(word) >= MIN_TOKEN_SIZE]
+    if not words:
+        return None
+    return " ".join(f"+{word}*" for word in words)
+
+
+def prefix_pattern(query: str) -> str:
+    """Anchored LIKE pattern (no leading wildcard, so an index can be used)."""
+    escaped = query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+    return escaped + "%"
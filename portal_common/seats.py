@@ -0,0 +1,242 @@
+"""Live seat-availability updates over Server-Sent Events.
+
+One ``SeatBroadcaster`` per process holds the seat counts of every event.
+It pushes each change to all connected ``EventSource`` clients. Clients
+never touch the database. A single poller thread reloads the counts with
+one query over ``event``, and only when something may have changed: the
+registration path calls ``notify()`` after a reservation, and the
+``version`` callable (the shared data version) reveals writes by other
+workers and the admin portal. Reloads are at least ``min_interval`` apart,
+so a flash crowd of registrations costs a few queries a second however many
+students are watching.
+
+Each change is serialized once into a short history of ``(id, message)``
+pairs that every connection reads from. A browser reconnecting with
+``Last-Event-ID`` gets just what it missed. One that missed more than the
+history holds gets a fresh snapshot. Idle connections receive a comment line
+every ``heartbeat`` seconds so proxies keep them open. Each connection holds
+a worker thread (or greenlet) while open, so serve many watchers with an
+async worker class such as gunicorn's ``gevent``.
+"""
+from collections import deque
+import json
+import os
+import re
+import threading
+import time
+
+from flask import Response
+from mysql.connector import Error
+
+SEATS_SQL = """
+    SELECT event_id, max_seats, IFNULL(registration_count, 0) AS registered_count
+    FROM event
+"""
+
+
+def seat_status(event_id: int, registered: int, capacity) -> dict:
+    """Seat fields as the events page computes them."""
+    capacity = capacity or 0
+    return {
+        "event_id": event_id,
+        "registered": registered,
+        "capacity": capacity,
+        "fill_percent": int((registered / capacity) * 100) if capacity else 0,
+        "status": "Full" if capacity and registered >= capacity else "Open",
+    }
+
+
+def _message(kind: str, seq: int, payload) -> str:
+    data = json.dumps(payload, separators=(",", ":"))
+    return f"id: {seq}\nevent: {kind}\ndata: {data}\n\n"
+
+
+class SeatBroadcaster:
+    """Fan seat-count changes out to SSE subscribers; see the module docstring."""
+
+    def __init__(
+        self,
+        pool,
+        version=None,
+        poll_interval: float = 1.0,
+        min_interval: float = 0.25,
+        heartbeat: float = 15.0,
+        history: int = 1024,
+        logger=None,
+    ):
+        self.pool = pool
+        self.version = version
+        self.poll_interval = poll_interval
+        self.min_interval = min_interval
+        self.heartbeat = heartbeat
+        self.logger = logger
+
+        self._cond = threading.Condition()
+        self._refresh_lock = threading.Lock()
+        self._attempts = 0
+        self._wake = threading.Event()
+        self._seats = {}
+        self._seq = 0
+        self._history = deque(maxlen=history)
+        self._loaded_version = None
+        self._loaded = False
+        self._subscribers = 0
+        self._thread = None
+        self._counters = {"refreshes": 0, "refresh_errors": 0, "changes": 0, "connections": 0}
+
+    @classmethod
+    def from_env(cls, pool, prefix: str = "SEAT_STREAM_", **kwargs):
+        return cls(
+            pool,
+            poll_interval=float(os.getenv(prefix + "POLL_INTERVAL", "1")),
+            min_interval=float(os.getenv(prefix + "MIN_INTERVAL", "0.25")),
+            heartbeat=float(os.getenv(prefix + "HEARTBEAT", "15")),
+            **kwargs,
+        )
+
+    # --------------------------
+    # PUBLISHING
+    # --------------------------
+    def notify(self):
+        """Ask the poller to reload counts soon (e.g. after a reservation)."""
+        self._wake.set()
+
+    def refresh(self):
+        """Reload every event's counts and publish the ones that changed."""
+        with self._refresh_lock:
+            self._refresh()
+
+    def refresh_if_stale(self):
+        """Refresh once however many threads ask at the same moment.
+
+        Callers that queued behind an in-flight refresh take its result (or
+        its failure) instead of issuing their own query.
+        """
+        attempt = self._attempts
+        with self._refresh_lock:
+            if self._attempts == attempt and self._stale():
+                self._refresh()
+
+    def _refresh(self):
+        self._attempts += 1
+        version = self.version() if self.version is not None else None
+        try:
+            conn = self.pool.acquire()
+            try:
+                cursor = conn.cursor(dictionary=True)
+                try:
+                    cursor.execute(SEATS_SQL)
+                    rows = cursor.fetchall()
+                finally:
+                    cursor.close()
+                conn.rollback()  # end the read's snapshot before pooling
+            finally:
+                conn.close()
+        except Error as err:
+            with self._cond:
+                self._counters["refresh_errors"] += 1
+            if self.logger is not None:
+                self.logger.error("Seat refresh failed: %s", err)
+            return
+
+        with self._cond:
+            self._counters["refreshes"] += 1
+            current = {}
+            for row in rows:
+                seat = seat_status(row["event_id"], int(row["registered_count"]), row["max_seats"])
+                current[seat["event_id"]] = seat
+                if self._loaded and self._seats.get(seat["event_id"]) != seat:
+                    self._seq += 1
+                    self._history.append((self._seq, _message("seats", self._seq, seat)))
+                    self._counters["changes"] += 1
+            changed = self._loaded and self._seats != current
+            self._seats = current
+            self._loaded = True
+            self._loaded_version = version
+            if changed:
+                self._cond.notify_all()
+
+    def _stale(self) -> bool:
+        return not self._loaded or (self.version is not None and self.version() != self._loaded_version)
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.poll_interval)
+            self._wake.clear()
+            if self._subscribers and self._stale():
+                self.refresh_if_stale()
+                time.sleep(self.min_interval)
+
+    def _ensure_poller(self):
+        if self._thread is None:
+            with self._cond:
+                if self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name="seat-broadcaster", daemon=True)
+                    self._thread.start()
+
+    # --------------------------
+    # SUBSCRIBING
+    # --------------------------
+    def _snapshot(self) -> str:
+        return _message("snapshot", self._seq, list(self._seats.values()))
+
+    def _since(self, last_seq):
+        """Messages after ``last_seq``, or ``None`` if history no longer covers it."""
+        if last_seq == self._seq:
+            return []
+        if last_seq > self._seq or not self._history or self._history[0][0] > last_seq + 1:
+            return None
+        return [message for seq, message in self._history if seq > last_seq]
+
+    def stream(self, last_event_id=None):
+        """Yield SSE text for one subscriber until the client disconnects."""
+        self._ensure_poller()
+        if self._stale():
+            self.refresh_if_stale()
+        with self._cond:
+            self._subscribers += 1
+            self._counters["connections"] += 1
+        try:
+            yield "retry: 3000\n\n"
+            with self._cond:
+                backlog = None
+                # ASCII digits only; anything else (e.g. "²") gets a snapshot.
+                if last_event_id is not None and re.fullmatch(r"[0-9]+", last_event_id):
+                    backlog = self._since(int(last_event_id))
+                chunk = self._snapshot() if backlog is None else "".join(backlog)
+                seen = self._seq
+            if chunk:
+                yield chunk
+
+            while True:
+                with self._cond:
+                    self._cond.wait_for(lambda: self._seq != seen, timeout=self.heartbeat)
+                    if self._seq == seen:
+                        chunk = ": keepalive\n\n"
+                    else:
+                        backlog = self._since(seen)
+                        chunk = self._snapshot() if backlog is None else "".join(backlog)
+                        seen = self._seq
+                yield chunk
+        finally:
+            with self._cond:
+                self._subscribers -= 1
+
+    def response(self, last_event_id=None) -> Response:
+        return Response(
+            self.stream(last_event_id),
+            mimetype="text/event-stream",
+            headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        )
+
+    def stats(self) -> dict:
+        with self._cond:
+            stats = dict(self._counters)
+            stats.update(subscribers=self._subscribers, events=len(self._seats), sequence=self._seq)
+        return stats
+
+    def init_app(self, app):
+        """Expose broadcaster counters through ``/metrics`` when enabled."""
+        registry = app.extensions.get("metrics")
+        if registry is not None:
+            registry.add_source("seat_stream", self.stats)
@@ -0,0 +1,151 @@
+"""Stream large query results to the client without materialising them."""
+import csv
+from datetime import date, datetime, time, timedelta
+from decimal import Decimal
+import json
+import zlib
+
+from mysql.connector import Error
+
+STREAM_CHUNK_SIZE = 1000
+
+EXPORT_MIMETYPES = {
+    "csv": "text/csv",
+    "ndjson": "application/x-ndjson",
+}
+
+
+class _LineBuffer:
+    """File-like sink for ``csv.writer`` that hands back what was written."""
+
+    def __init__(self):
+        self._parts = []
+
+    def write(self, text):
+        self._parts.append(text)
+
+    def drain(self) -> str:
+        text = "".join(self._parts)
+        self._parts.clear()
+        return text
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, (Decimal, timedelta)):
+        return str(value)
+    raise TypeError(f"Cannot serialise {type(value).__name__}")
+
+
+def _encode_csv(chunks, header):
+    out = _LineBuffer()
+    writer = csv.writer(out)
+    if header:
+        writer.writerow(header)
+        yield out.drain()
+    for rows in chunks:
+        writer.writerows(rows)
+        yield out.drain()
+
+
+def _encode_ndjson(chunks, columns):
+    for rows in chunks:
+        yield "".join(
+            json.dumps(dict(zip(columns, row)), default=_json_default) + "\n" for row in rows
+        )
+
+
+class _QueryStream:
+    """Response body over a running query that releases it on ``close()``.
+
+    Werkzeug closes the body after the response is sent, including for HEAD
+    requests and clients that disconnect before the first chunk, where a
+    bare generator's ``finally`` would never run.
+    """
+
+    def __init__(self, chunks, release):
+        self._chunks = chunks
+        self._release = release
+
+    def __iter__(self):
+        return self._chunks
+
+    def close(self):
+        self._chunks.close()
+        self._release()
+
+
+def stream_query(
+    conn,
+    sql: str,
+    params=(),
+    fmt: str = "csv",
+    header=None,
+    gzip: bool = False,
+    chunk_size: int = STREAM_CHUNK_SIZE,
+):
+    """Run ``sql`` on an unbuffered cursor and return an iterable of bytes.
+
+    ``fmt`` is ``"csv"`` (with an optional ``header`` row) or ``"ndjson"``
+    (one JSON object per row, keyed by the selected column names). With
+    ``gzip`` the output is a gzip stream compressed chunk by chunk.
+
+    The query is executed before this returns, so connection and SQL errors
+    still surface in the view. Rows are then pulled with ``fetchmany`` as the
+    client consumes the response, keeping memory flat regardless of result
+    size. The returned body owns ``conn`` and releases it when the stream
+    ends or the body is closed, whether or not iteration ever started.
+    """
+    if fmt not in EXPORT_MIMETYPES:
+        conn.close()
+        raise ValueError(f"Unknown export format: {fmt}")
+
+    cursor = conn.cursor(buffered=False)
+    try:
+        cursor.execute(sql, params)
+    except Error:
+        cursor.close()
+        conn.close()
+        raise
+
+    released = []
+
+    def release():
+        if released:
+            return
+        released.append(True)
+        # An abandoned stream leaves unread rows; the pool discards such
+        # connections rather than reusing them.
+        try:
+            cursor.close()
+        except Error:
+            pass
+        conn.close()
+
+    def fetch_chunks():
+        while True:
+            rows = cursor.fetchmany(chunk_size)
+            if not rows:
+                return
+            yield rows
+
+    def generate():
+        if fmt == "csv":
+            texts = _encode_csv(fetch_chunks(), header)
+        else:
+            texts = _encode_ndjson(fetch_chunks(), cursor.column_names)
+        compressor = zlib.compressobj(wbits=zlib.MAX_WBITS | 16) if gzip else None
+        try:
+            for text in texts:
+                data = text.encode("utf-8")
+                if compressor is not None:
+                    data = compressor.compress(data)
+                if data:
+                    yield data
+            if compressor is not None:
+                yield compressor.flush()
+        finally:
+            release()
+
+    return _QueryStream(generate(), release)
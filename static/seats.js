@@ -0,0 +1,83 @@
+// Live seat counts: applies updates from /events/stream to the event cards
+// (events page) and the event dropdown (register page) in place.
+(function () {
+    if (!window.EventSource) {
+        return;
+    }
+
+    function updateCard(card, seat) {
+        const full = seat.status === 'Full';
+        card.classList.toggle('is-full', full);
+
+        const pill = card.querySelector('.status-pill');
+        pill.classList.toggle('open', !full);
+        pill.classList.toggle('full', full);
+        pill.textContent = full ? 'Full' : 'Seats open';
+
+        card.querySelector('.capacity-top p').textContent =
+            seat.registered + ' / ' + (seat.capacity || 'Unlimited') + ' seats';
+        card.querySelector('.capacity-top span').textContent = seat.fill_percent + '%';
+        card.querySelector('.capacity-progress__bar').style.setProperty('--fill-percent', seat.fill_percent + '%');
+
+        const register = card.querySelector('.card-actions .btn-primary');
+        register.classList.toggle('disabled', full);
+        if (full) {
+            register.setAttribute('aria-disabled', 'true');
+            register.setAttribute('tabindex', '-1');
+        } else {
+            register.removeAttribute('aria-disabled');
+            register.removeAttribute('tabindex');
+        }
+    }
+
+    function updateOption(option, seat) {
+        option.dataset.registered = seat.registered;
+        option.dataset.capacity = seat.capacity;
+        option.disabled = seat.status === 'Full' && !option.selected;
+        option.textContent = option.dataset.label + (seat.status === 'Full' ? ' — Full' : '');
+    }
+
+    function showSelectedSeats() {
+        const select = document.getElementById('event_id');
+        const status = document.getElementById('seatStatus');
+        if (!select || !status) {
+            return;
+        }
+        const option = select.options[select.selectedIndex];
+        if (!option || !option.value) {
+            status.textContent = '';
+            return;
+        }
+        const capacity = Number(option.dataset.capacity);
+        const registered = Number(option.dataset.registered);
+        status.textContent = capacity
+            ? Math.max(capacity - registered, 0) + ' of ' + capacity + ' seats left'
+            : registered + ' registered · unlimited seats';
+    }
+
+    function apply(seat) {
+        document.querySelectorAll('[data-event-id="' + seat.event_id + '"]').forEach(function (node) {
+            if (node.tagName === 'OPTION') {
+                updateOption(node, seat);
+            } else {
+                updateCard(node, seat);
+            }
+        });
+    }
+
+    const select = document.getElementById('event_id');
+    if (select) {
+        select.addEventListener('change', showSelectedSeats);
+        showSelectedSeats();
+    }
+
+    const source = new EventSource('/events/stream');
+    source.addEventListener('snapshot', function (e) {
+        JSON.parse(e.data).forEach(apply);
+        showSelectedSeats();
+    });
+    source.addEventListener('seats', function (e) {
+        apply(JSON.parse(e.data));
+        showSelectedSeats();
+    });
+})();
@@ -0,0 +1,114 @@
+import threading
+import time
+
+from flask import Flask
+import pytest
+from werkzeug.exceptions import TooManyRequests
+
+from portal_common.admission import AdmissionController
+
+
+def _wait_until(predicate, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "condition not reached"
+        time.sleep(0.005)
+
+
+def _start(target, *args):
+    thread = threading.Thread(target=target, args=args, daemon=True)
+    thread.start()
+    return thread
+
+
+def test_per_key_limit_leaves_room_for_other_keys():
+    admission = AdmissionController(global_limit=3, per_key_limit=2, max_wait=0.05)
+    admission.acquire("hot")
+    admission.acquire("hot")
+    with pytest.raises(TooManyRequests):
+        admission.acquire("hot")  # waits max_wait, then is shed
+    admission.acquire("cold")
+    assert admission.stats()["in_flight"] == 3
+    assert admission.stats()["shed_timeout"] == 1
+
+
+def test_freed_slots_go_to_waiters_in_arrival_order():
+    admission = AdmissionController(global_limit=1, per_key_limit=1, max_wait=2.0)
+    admission.acquire("a")
+    order = []
+
+    def worker(key):
+        admission.acquire(key)
+        order.append(key)
+        admission.release(key)
+
+    threads = []
+    for key in ("b", "c", "d"):
+        threads.append(_start(worker, key))
+        _wait_until(lambda n=len(threads): admission.stats()["waiting"] == n)
+
+    admission.release("a")
+    for thread in threads:
+        thread.join(2)
+    assert order == ["b", "c", "d"]
+    assert admission.stats()["queued"] == 3
+
+
+def test_waiter_for_a_busy_key_does_not_block_others():
+    admission = AdmissionController(global_limit=2, per_key_limit=1, max_wait=2.0)
+    admission.acquire("hot")
+    admission.acquire("other")
+    admitted = []
+
+    def worker(key):
+        admission.acquire(key)
+        admitted.append(key)
+
+    _start(worker, "hot")
+    _wait_until(lambda: admission.stats()["waiting"] == 1)
+    _start(worker, "cold")
+    _wait_until(lambda: admission.stats()["waiting"] == 2)
+
+    # Only a global slot frees up; "hot" is still at its per-key limit.
+    admission.release("other")
+    _wait_until(lambda: admitted == ["cold"])
+    assert admission.stats()["waiting"] == 1
+
+
+def test_full_queue_sheds_immediately_with_retry_after():
+    admission = AdmissionController(global_limit=1, per_key_limit=1, queue_size=1, max_wait=2.0)
+    admission.acquire("a")
+    waiter = _start(lambda: (admission.acquire("a"), admission.release("a")))
+    _wait_until(lambda: admission.stats()["waiting"] == 1)
+
+    began = time.monotonic()
+    with pytest.raises(TooManyRequests) as excinfo:
+        admission.acquire("b")
+    assert time.monotonic() - began < 0.5
+    assert excinfo.value.retry_after >= 1
+    assert admission.stats()["shed_queue_full"] == 1
+
+    admission.release("a")
+    waiter.join(2)
+    assert admission.stats()["in_flight"] == 0
+
+
+def test_limit_guards_only_write_methods():
+    admission = AdmissionController(global_limit=1, per_key_limit=1, queue_size=0, max_wait=0)
+    app = Flask(__name__)
+
+    @app.route("/register", methods=["GET", "POST"])
+    @admission.limit(lambda: "event-1")
+    def register():
+        return "ok"
+
+    client = app.test_client()
+    admission.acquire("event-1")
+    assert client.get("/register").status_code == 200
+    response = client.post("/register")
+    assert response.status_code == 429
+    assert response.headers["Retry-After"].isdigit()
+
+    admission.release("event-1")
+    assert client.post("/register").status_code == 200
+    assert admission.stats()["in_flight"] == 0
@@ -0,0 +1,85 @@
+import io
+
+import pytest
+
+from portal_common.bulk_import import ImportFormatError, import_registrations
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.rows = []
+
+    def execute(self, sql, params=()):
+        if "FROM event" in sql:
+            self.rows = [(event_id, None, 0) for event_id in params if event_id in self.conn.events]
+        elif "FROM registration" in sql:
+            self.rows = []
+        else:
+            self.rows = [(usn,) for usn in params if usn in self.conn.students]
+
+    def fetchall(self):
+        return self.rows
+
+    def executemany(self, sql, rows):
+        self.conn.pending.extend(rows)
+
+    def close(self):
+        pass
+
+
+class _Conn:
+    def __init__(self, events=(1,), students=range(1, 100_000)):
+        self.events = set(events)
+        self.students = set(students)
+        self.pending = []
+        self.committed = []
+
+    def cursor(self):
+        return _Cursor(self)
+
+    def commit(self):
+        self.committed.extend(self.pending)
+        self.pending = []
+
+    def rollback(self):
+        self.pending = []
+
+
+def _upload(data: bytes):
+    return io.TextIOWrapper(io.BytesIO(data), encoding="utf-8-sig", newline="")
+
+
+def test_non_ascii_digits_are_row_errors():
+    conn = _Conn()
+    report = import_registrations(conn, _upload("USN,event_id\n²,1\n7,1\n".encode()))
+    assert report["imported"] == 1
+    assert report["errors"] == [(2, "²", "1", "USN must be numeric")]
+    assert report["file_error"] is None
+
+
+def test_undecodable_bytes_keep_the_committed_chunks():
+    rows = b"".join(b"%d,1\n" % usn for usn in range(1, 3001))  # > one decode buffer
+    conn = _Conn()
+    report = import_registrations(conn, _upload(b"USN,event_id\n" + rows + b"\xff\xfe,1\n"), chunk_size=500)
+
+    assert report["imported"] == len(conn.committed) > 0
+    assert report["file_error"].startswith("Stopped reading at line")
+    assert "codec can't decode" in report["file_error"]
+
+
+def test_oversized_field_stops_reading_but_returns_the_report():
+    data = b"USN,event_id\n1,1\n2,1\n" + b"3," + b"9" * 200_000 + b"\n4,1\n"
+    conn = _Conn()
+    report = import_registrations(conn, _upload(data))
+
+    assert report["imported"] == 2
+    assert conn.committed == [(1, 1), (1, 2)]
+    assert report["file_error"].startswith("Stopped reading at line 4:")
+
+
+def test_unusable_header_raises_before_importing():
+    with pytest.raises(ImportFormatError):
+        import_registrations(_Conn(), _upload(b"name\nAda\n"))
+    with pytest.raises(ImportFormatError):
+        import_registrations(_Conn(), _upload(b"\xff\xfeUSN\n1\n"))
@@ -0,0 +1,80 @@
+import threading
+
+import pytest
+
+from portal_common.cache import SnapshotCache
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_concurrent_misses_run_the_loader_once():
+    calls = []
+    release = threading.Event()
+
+    def loader():
+        calls.append(1)
+        release.wait(2)
+        return {"events": 3}
+
+    cache = SnapshotCache(loader, ttl=30)
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(cache.get())) for _ in range(20)]
+    for thread in threads:
+        thread.start()
+    release.set()
+    for thread in threads:
+        thread.join(2)
+
+    assert len(calls) == 1
+    assert results == [{"events": 3}] * 20
+
+
+def test_ttl_invalidate_and_version_make_snapshot_stale():
+    clock = _Clock()
+    version = ["v1"]
+    values = iter(range(100))
+    cache = SnapshotCache(lambda: next(values), ttl=10, clock=clock, version=lambda: version[0])
+
+    assert cache.get() == 0
+    assert cache.get() == 0
+    clock.now = 10
+    assert cache.get() == 1
+    cache.invalidate()
+    assert cache.get() == 2
+    version[0] = "v2"
+    assert cache.get() == 3
+    assert cache.get() == 3
+
+
+def test_invalidate_during_load_is_not_lost():
+    loads = []
+
+    def loader():
+        loads.append(1)
+        cache.invalidate()  # a write commits while the snapshot is being read
+        return len(loads)
+
+    cache = SnapshotCache(loader, ttl=30)
+    assert cache.get() == 1
+    assert cache.get() == 2
+
+
+def test_loader_errors_are_not_cached():
+    outcomes = iter([RuntimeError("db down"), "ok"])
+
+    def loader():
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    cache = SnapshotCache(loader, ttl=30)
+    with pytest.raises(RuntimeError):
+        cache.get()
+    assert cache.get() == "ok"
@@ -0,0 +1,161 @@
+import json
+import os
+import time
+
+import pytest
+
+from portal_common.ingest import FeedbackQueue
+
+
+class _Cursor:
+    def __init__(self, table):
+        self.table = table
+        self.rowcount = 0
+
+    def executemany(self, sql, rows):
+        inserted = 0
+        for row in rows:
+            self.execute(sql, row)
+            inserted += self.rowcount
+        self.rowcount = inserted
+
+    def execute(self, sql, row):
+        # Mimic the unique idempotency_key: a replayed key is a no-op.
+        key = row[4]
+        if key in self.table:
+            self.rowcount = 0
+        else:
+            self.table[key] = row
+            self.rowcount = 1
+
+    def close(self):
+        pass
+
+
+class _Pool:
+    def __init__(self):
+        self.table = {}
+
+    def acquire(self):
+        return self
+
+    def cursor(self):
+        return _Cursor(self.table)
+
+    def commit(self):
+        pass
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+def _line(key, usn):
+    record = {"key": key, "event_id": 1, "usn": usn, "rating": 5, "comment": "great"}
+    return json.dumps(record) + "\n"
+
+
+@pytest.fixture
+def pool():
+    return _Pool()
+
+
+def test_recover_replays_dead_segment_and_skips_torn_line(tmp_path, pool):
+    segment = tmp_path / "feedback-99999-1-1.log"
+    # A worker died mid-append: two complete records, then half a line.
+    segment.write_text(_line("k1", 101) + _line("k2", 102) + _line("k3", 103)[:20])
+
+    queue = FeedbackQueue(str(tmp_path), pool, flush_interval=60)
+    assert queue.recover() == 1
+    queue.close()  # recover() woke the flusher; close() waits for it and flushes
+
+    assert sorted(pool.table) == ["k1", "k2"]
+    assert not segment.exists()
+    assert queue.stats()["pending"] == 0
+
+
+def test_replayed_segment_inserts_nothing_twice(tmp_path, pool):
+    pool.table["k1"] = (1, 101, 5, "great", "k1")  # flushed before the crash
+    (tmp_path / "feedback-99999-1-1.log").write_text(_line("k1", 101) + _line("k2", 102))
+
+    queue = FeedbackQueue(str(tmp_path), pool, flush_interval=60)
+    queue.recover()
+    queue.close()
+    assert sorted(pool.table) == ["k1", "k2"]
+    assert queue.stats()["flushed"] == 1
+    assert queue.stats()["duplicates"] == 1
+
+
+def test_recover_leaves_segments_of_live_queues_alone(tmp_path, pool):
+    live = FeedbackQueue(str(tmp_path), pool, flush_interval=60, fsync=False)
+    assert live.enqueue(1, 101, 4, None)
+
+    other = FeedbackQueue(str(tmp_path), _Pool(), flush_interval=60)
+    assert other.recover() == 0
+
+    assert live.flush() == 1
+    assert os.listdir(tmp_path) == []
+    live.close()
+    other.close()
+
+
+def test_enqueue_rejects_when_full(tmp_path, pool):
+    queue = FeedbackQueue(str(tmp_path), pool, max_pending=1, flush_interval=60, fsync=False)
+    assert queue.enqueue(1, 101, 4, "ok")
+    assert not queue.enqueue(1, 102, 4, "ok")
+    assert queue.stats()["rejected"] == 1
+    queue.close()
+    assert queue.stats()["pending"] == 0
+
+
+def test_records_of_the_wrong_shape_are_skipped(tmp_path, pool):
+    (tmp_path / "feedback-99999-1-1.log").write_text(
+        '{"key": "k0"}\n' + "[1, 2]\n" + _line("k1", 101) + '{"key": "k2", "event_id": 1}\n'
+    )
+    queue = FeedbackQueue(str(tmp_path), pool, flush_interval=60)
+    queue.recover()
+    queue.close()
+    assert sorted(pool.table) == ["k1"]
+    assert queue.stats()["dropped"] == 3
+    assert os.listdir(tmp_path) == []
+
+
+def test_flusher_survives_unexpected_errors(tmp_path, pool, monkeypatch):
+    queue = FeedbackQueue(str(tmp_path), pool, flush_interval=0.01, fsync=False)
+    real_unlink = os.unlink
+    failures = []
+
+    def unlink(path):
+        if not failures:
+            failures.append(path)
+            raise OSError(28, "No space left on device")
+        real_unlink(path)
+
+    monkeypatch.setattr("portal_common.ingest.os.unlink", unlink)
+    queue.enqueue(1, 101, 5, None)
+    deadline = time.monotonic() + 2
+    while queue.stats()["failed_flushes"] == 0:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+    assert queue._thread.is_alive()
+    queue.enqueue(1, 102, 5, None)
+    queue.close()
+    assert len(pool.table) == 2
+
+
+def test_dead_flusher_is_restarted(tmp_path, pool):
+    queue = FeedbackQueue(str(tmp_path), pool, flush_interval=60, fsync=False)
+    queue.enqueue(1, 101, 5, None)
+    dead = queue._thread
+    queue._stopping.set()
+    queue._wake.set()
+    dead.join(2)
+    queue._stopping.clear()
+
+    queue.enqueue(1, 102, 5, None)
+    assert queue._thread is not dead and queue._thread.is_alive()
+    queue.close()
+    assert len(pool.table) == 2
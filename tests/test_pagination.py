@@ -0,0 +1,95 @@
+import base64
+from datetime import datetime
+from decimal import Decimal
+
+import pytest
+
+from portal_common.pagination import InvalidCursor, decode_cursor, encode_cursor, fetch_page, page_size_from
+
+
+def test_cursor_round_trips_mixed_values():
+    values = [datetime(2024, 3, 1, 9, 30, 15), Decimal("4.50"), "Hack Night", 42, None]
+    token = encode_cursor(values)
+    assert "=" not in token
+    assert decode_cursor(token) == values
+
+
+@pytest.mark.parametrize("token", ["", "not base64!", encode_cursor([1])[:-2] + "@@", "eyJkdCI6IngifQ", "W3siZHQiOiJ4In1d"])
+def test_decode_rejects_garbage(token):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token)
+
+
+
+def _raw(payload: str) -> str:
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+@pytest.mark.parametrize(
+    "payload",
+    ['[[1, 2]]', '[{"dt": "2024-01-01", "x": 1}]', '[{"dec": 5}]', '[{"other": "1"}]', '[NaN]', '[Infinity]'],
+)
+def test_decode_rejects_non_scalar_values(payload):
+    with pytest.raises(InvalidCursor):
+        decode_cursor(_raw(payload))
+
+
+def test_decode_checks_width():
+    token = encode_cursor([datetime(2024, 1, 1), 7])
+    assert decode_cursor(token, width=2) == [datetime(2024, 1, 1), 7]
+    with pytest.raises(InvalidCursor):
+        decode_cursor(token, width=3)
+
+def test_page_size_is_clamped():
+    assert page_size_from("20") == 20
+    assert page_size_from("0") == 1
+    assert page_size_from("100000") == 500
+    assert page_size_from("abc", default=7) == 7
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+        self.executed = None
+
+    def execute(self, sql, params):
+        self.executed = (sql, params)
+
+    def fetchall(self):
+        return list(self.rows)
+
+
+ORDER = [("e.event_date", "event_date"), ("e.event_id", "event_id")]
+
+
+def test_fetch_page_builds_keyset_condition_from_cursor():
+    after = encode_cursor([datetime(2024, 1, 2), 7])
+    cursor = _Cursor([{"event_date": datetime(2024, 1, 3), "event_id": 9}])
+    rows, page = fetch_page(cursor, "SELECT * FROM event e", ORDER, page_size=2, after=after)
+
+    sql, params = cursor.executed
+    assert "(e.event_date > %s) OR (e.event_date = %s AND e.event_id > %s)" in sql
+    assert sql.endswith("ORDER BY e.event_date ASC, e.event_id ASC LIMIT %s")
+    assert params == [datetime(2024, 1, 2), datetime(2024, 1, 2), 7, 3]
+    assert rows == cursor.rows
+    assert page["next"] is None
+    assert decode_cursor(page["prev"]) == [datetime(2024, 1, 3), 9]
+
+
+def test_fetch_page_walking_backwards_reverses_rows():
+    before = encode_cursor([datetime(2024, 1, 5), 20])
+    fetched = [{"event_date": datetime(2024, 1, 4), "event_id": n} for n in (19, 18, 17)]
+    cursor = _Cursor(fetched)
+    rows, page = fetch_page(cursor, "SELECT * FROM event e", ORDER, page_size=2, before=before)
+
+    sql, params = cursor.executed
+    assert "e.event_date < %s" in sql
+    assert "ORDER BY e.event_date DESC, e.event_id DESC" in sql
+    assert [row["event_id"] for row in rows] == [18, 19]
+    assert decode_cursor(page["next"])[1] == 19
+    assert decode_cursor(page["prev"])[1] == 18
+
+
+def test_fetch_page_rejects_cursor_of_wrong_width():
+    with pytest.raises(InvalidCursor):
+        fetch_page(_Cursor([]), "SELECT * FROM event e", ORDER, after=encode_cursor([1]))
@@ -0,0 +1,92 @@
+from mysql.connector import errorcode
+from mysql.connector.errors import IntegrityError
+import pytest
+
+from portal_common.registrations import (
+    ALREADY_REGISTERED,
+    EVENT_FULL,
+    RESERVED,
+    STUDENT_NOT_FOUND,
+    register_student,
+)
+
+
+class _Result:
+    def __init__(self, rows):
+        self.with_rows = rows is not None
+        self._rows = list(rows or [])
+
+    def fetchone(self):
+        return self._rows.pop(0) if self._rows else None
+
+    def fetchall(self):
+        rows, self._rows = self._rows, []
+        return rows
+
+
+class _Cursor:
+    def __init__(self, conn):
+        self.conn = conn
+        self.closed = False
+
+    def execute(self, sql, params=None, multi=False):
+        self.conn.calls.append((sql, params, multi))
+        if self.conn.error is not None:
+            raise self.conn.error
+        # A CALL yields the procedure's SELECT, then the CALL's own status.
+        return iter([_Result([self.conn.row]), _Result(None)])
+
+    def close(self):
+        self.closed = True
+
+
+class _Conn:
+    def __init__(self, row=None, error=None):
+        self.row = row
+        self.error = error
+        self.calls = []
+        self.cursors = []
+        self.rolled_back = False
+
+    def cursor(self):
+        cursor = _Cursor(self)
+        self.cursors.append(cursor)
+        return cursor
+
+    def rollback(self):
+        self.rolled_back = True
+
+
+def test_reserved_returns_the_new_registration_id():
+    conn = _Conn(row=(RESERVED, 7001))
+    assert register_student(conn, 12, 1001) == (RESERVED, 7001)
+    assert conn.calls == [("CALL register_student(%s, %s)", (12, 1001), True)]
+    assert conn.cursors[0].closed
+    assert not conn.rolled_back
+
+
+def test_procedure_outcomes_pass_through_without_an_id():
+    conn = _Conn(row=(EVENT_FULL, None))
+    assert register_student(conn, 12, 1001) == (EVENT_FULL, None)
+
+
+@pytest.mark.parametrize(
+    "errno, outcome",
+    [
+        (errorcode.ER_DUP_ENTRY, ALREADY_REGISTERED),
+        (errorcode.ER_NO_REFERENCED_ROW_2, STUDENT_NOT_FOUND),
+    ],
+)
+def test_constraint_violations_map_to_outcomes(errno, outcome):
+    conn = _Conn(error=IntegrityError(msg="constraint", errno=errno))
+    assert register_student(conn, 12, 1001) == (outcome, None)
+    assert conn.rolled_back
+    assert conn.cursors[0].closed
+
+
+def test_other_integrity_errors_propagate():
+    error = IntegrityError(msg="bad null", errno=errorcode.ER_BAD_NULL_ERROR)
+    conn = _Conn(error=error)
+    with pytest.raises(IntegrityError):
+        register_student(conn, 12, 1001)
+    assert conn.rolled_back
@@ -0,0 +1,101 @@
+from flask import Flask
+import pytest
+
+from portal_common.conditional import DataVersion, conditional
+from portal_common.routing import ConnectionRouter, read_unsettled
+
+
+class _Cursor:
+    def __init__(self, pool):
+        self.pool = pool
+
+    def execute(self, sql):
+        pass
+
+    def fetchone(self):
+        return {"Seconds_Behind_Source": self.pool.lag}
+
+    def close(self):
+        pass
+
+
+class _Pool:
+    def __init__(self, name, lag=0):
+        self.name = name
+        self.lag = lag
+        self.config = {"host": name}
+
+    def acquire(self, timeout=None):
+        return self
+
+    def cursor(self, dictionary=False):
+        return _Cursor(self)
+
+    def close(self):
+        pass
+
+    def stats(self):
+        return {}
+
+
+@pytest.fixture
+def app():
+    app = Flask(__name__)
+    app.secret_key = "test"
+    return app
+
+
+def _router(last_write):
+    return ConnectionRouter(_Pool("primary"), [_Pool("replica")], lag_check_interval=0, last_write=last_write)
+
+
+def test_reads_use_the_replica_right_after_a_write(app, monkeypatch):
+    now = 1_000_000.0
+    monkeypatch.setattr("portal_common.routing.time.time", lambda: now)
+    router = _router(last_write=lambda: now - 0.1)
+
+    with app.test_request_context("/events"):
+        assert router.acquire().name == "replica"
+        assert read_unsettled()
+
+    # Once a lag check shows the replica replayed past the write, reads settle.
+    router.last_write = lambda: now - 5
+    with app.test_request_context("/events"):
+        assert router.acquire().name == "replica"
+        assert not read_unsettled()
+    assert router.stats()["unsettled_reads"] == 1
+
+
+def test_writer_reads_their_own_writes_from_the_primary(app):
+    router = _router(last_write=None)
+    with app.test_request_context("/register", method="POST") as ctx:
+        assert router.acquire().name == "primary"
+        stamp = dict(ctx.session)
+    with app.test_request_context("/events") as ctx:
+        ctx.session.update(stamp)
+        assert router.acquire().name == "primary"
+    with app.test_request_context("/events"):
+        assert router.acquire().name == "replica"
+
+
+def test_unsettled_pages_are_sent_without_validators(app, tmp_path):
+    data_version = DataVersion(str(tmp_path / "version"))
+    router = _router(last_write=data_version.written_at)
+
+    @app.route("/events")
+    @conditional(data_version)
+    def events():
+        router.acquire()
+        return "events"
+
+    client = app.test_client()
+    data_version.bump()
+    response = client.get("/events")
+    assert response.status_code == 200
+    assert response.headers.get("ETag") is None
+
+    # The replica has since replayed past the write.
+    router.last_write = lambda: 0
+    response = client.get("/events")
+    assert response.headers.get("ETag") is not None
+    assert client.get("/events", headers={"If-None-Match": response.headers["ETag"]}).status_code == 304
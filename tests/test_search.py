@@ -0,0 +1,19 @@
+from portal_common.search import boolean_match_terms, is_exact_id, prefix_pattern
+
+
+def test_exact_ids_are_ascii_digits_only():
+    assert is_exact_id("4021")
+    assert not is_exact_id("²")
+    assert not is_exact_id("٤٢")
+    assert not is_exact_id("42a")
+    assert not is_exact_id("")
+
+
+def test_boolean_terms_require_every_indexable_word():
+    assert boolean_match_terms("data sci") == "+data* +sci*"
+    assert boolean_match_terms('+hack -"night"') == "+hack* +night*"
+    assert boolean_match_terms("ai ml") is None
+
+
+def test_prefix_pattern_escapes_wildcards():
+    assert prefix_pattern("50%_off") == "50\\%\\_off%"
@@ -0,0 +1,63 @@
+import pytest
+
+from portal_common.seats import SeatBroadcaster
+
+
+class _Cursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, sql, params=None):
+        pass
+
+    def fetchall(self):
+        return [dict(row) for row in self.rows]
+
+    def close(self):
+        pass
+
+
+class _Pool:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def acquire(self, timeout=None):
+        return self
+
+    def cursor(self, dictionary=False):
+        return _Cursor(self.rows)
+
+    def rollback(self):
+        pass
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def broadcaster():
+    rows = [{"event_id": 1, "registered_count": 1, "max_seats": 2}]
+    seats = SeatBroadcaster(_Pool(rows), poll_interval=60)
+    seats.refresh()
+    rows[0]["registered_count"] = 2
+    seats.refresh()
+    return seats
+
+
+def _first_chunk(seats, last_event_id):
+    stream = seats.stream(last_event_id)
+    assert next(stream).startswith("retry:")
+    chunk = next(stream)
+    stream.close()
+    return chunk
+
+
+def test_resume_replays_missed_changes(broadcaster):
+    chunk = _first_chunk(broadcaster, "0")
+    assert chunk.startswith("id: 1\nevent: seats\n")
+
+
+@pytest.mark.parametrize("last_event_id", [None, "²", "١", "-1", "x"])
+def test_unusable_last_event_id_gets_a_snapshot(broadcaster, last_event_id):
+    chunk = _first_chunk(broadcaster, last_event_id)
+    assert "event: snapshot\n" in chunk